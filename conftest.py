@@ -0,0 +1,10 @@
+# conftest.py
+
+import os
+import sys
+
+# Los módulos del proyecto se importan desde la raíz (db., scrapper., ui., utils.)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# test_dashboard.py es una aplicación Flet para probar el dashboard a mano, no un test
+collect_ignore = ["test_dashboard.py"]
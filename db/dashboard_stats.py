@@ -0,0 +1,289 @@
+# db/dashboard_stats.py
+
+"""
+Estadísticas del dashboard calculadas en MongoDB.
+Una sola agregación ($facet con $group y $bucket) calcula los conteos por serie,
+los precios (promedio, mínimo, máximo, mediana), la distribución por rangos y los
+modelos más encontrados sobre toda la colección; al dashboard solo llega el resumen.
+Después, los documentos nuevos o actualizados se suman al resumen (fold_documents)
+sin volver a recorrer la colección; solo la mediana se vuelve a pedir, y solo cuando
+se muestra.
+"""
+
+import copy
+
+from pymongo.errors import OperationFailure
+
+# Rangos de precio del análisis: (límite inferior, etiqueta). El último no tiene tope.
+PRICE_RANGES = [
+    (0, "Menos de S/ 1,000"),
+    (1000, "S/ 1,000 - S/ 2,000"),
+    (2000, "S/ 2,000 - S/ 3,000"),
+    (3000, "S/ 3,000 - S/ 5,000"),
+    (5000, "Más de S/ 5,000"),
+]
+
+# Modelos que se muestran en el ranking
+TOP_MODELS = 10
+
+_PRICE_STATS = {
+    "count": {"$sum": 1},
+    "sum": {"$sum": "$price_numeric"},
+    "avg": {"$avg": "$price_numeric"},
+    "min": {"$min": "$price_numeric"},
+    "max": {"$max": "$price_numeric"},
+}
+
+
+def build_stats_pipeline(series=None, with_median=True):
+    """Construye la agregación de estadísticas, opcionalmente filtrada por serie"""
+    valid_price = {"$match": {"price_numeric": {"$gt": 0}}}
+    price_group = dict(_PRICE_STATS)
+    if with_median:
+        price_group["median"] = {"$median": {"input": "$price_numeric", "method": "approximate"}}
+
+    boundaries = [lower for lower, _ in PRICE_RANGES[1:]]
+    return [
+        # El filtro por serie va primero para aprovechar el índice 'series'
+        {"$match": {"series": series} if series else {}},
+        {"$facet": {
+            "series_counts": [
+                {"$group": {"_id": "$series", "count": {"$sum": 1}}}
+            ],
+            "price": [
+                valid_price,
+                {"$group": dict(price_group, _id=None)}
+            ],
+            "price_by_series": [
+                valid_price,
+                {"$group": dict(_PRICE_STATS, _id="$series")}
+            ],
+            "price_ranges": [
+                valid_price,
+                {"$bucket": {
+                    "groupBy": "$price_numeric",
+                    "boundaries": [0] + boundaries,
+                    "default": boundaries[-1],
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ],
+            # Todos los modelos (son pocos): así un modelo que entra al ranking por
+            # documentos nuevos se puede calcular sin volver a agregar
+            "model_counts": [
+                {"$group": {"_id": "$model_searched", "count": {"$sum": 1}}}
+            ],
+            # Última escritura incluida en el resumen
+            "ingested": [
+                {"$group": {"_id": None, "last": {"$max": "$ingested_at"}}}
+            ],
+        }}
+    ]
+
+
+def indexed_median(collection, series=None):
+    """Mediana de precios usando el índice de price_numeric (para servidores sin $median)"""
+    query = {"price_numeric": {"$gt": 0}}
+    if series:
+        query["series"] = series
+    count = collection.count_documents(query)
+    if count == 0:
+        return None
+    middle = list(
+        collection.find(query, {"price_numeric": 1, "_id": 0})
+        .sort("price_numeric", 1)
+        .skip(count // 2)
+        .limit(1)
+    )
+    return middle[0]["price_numeric"] if middle else None
+
+
+def fetch_price_median(collection, series=None):
+    """Mediana de los precios (del filtro) con una agregación de un solo campo"""
+    query = {"price_numeric": {"$gt": 0}}
+    if series:
+        query["series"] = series
+    try:
+        result = next(collection.aggregate([
+            {"$match": query},
+            {"$group": {"_id": None, "median": {"$median": {"input": "$price_numeric", "method": "approximate"}}}}
+        ]), None)
+    except OperationFailure:
+        return indexed_median(collection, series)
+    return result["median"] if result else None
+
+
+def top_models(model_counts):
+    """Ranking [(modelo, cantidad)] de los TOP_MODELS modelos más encontrados"""
+    ranked = sorted(model_counts.items(), key=lambda item: item[1], reverse=True)
+    return ranked[:TOP_MODELS]
+
+
+def fetch_dashboard_stats(collection, series=None):
+    """
+    Retorna las estadísticas del dashboard como diccionario:
+    total, series_counts, price (o None), price_by_series, price_ranges,
+    model_counts, top_models y last_ingested (última escritura incluida).
+    """
+    try:
+        result = next(collection.aggregate(build_stats_pipeline(series)), {})
+        median = None
+    except OperationFailure:
+        # MongoDB < 7.0 no soporta $median
+        result = next(collection.aggregate(build_stats_pipeline(series, with_median=False)), {})
+        median = indexed_median(collection, series)
+
+    series_counts = {
+        group["_id"]: group["count"]
+        for group in result.get("series_counts", [])
+        if group["_id"] is not None
+    }
+
+    price = None
+    if result.get("price"):
+        price = {key: value for key, value in result["price"][0].items() if key != "_id"}
+        if "median" not in price:
+            price["median"] = median
+
+    price_by_series = {
+        group["_id"]: {key: value for key, value in group.items() if key != "_id"}
+        for group in result.get("price_by_series", [])
+        if group["_id"] is not None
+    }
+
+    bucket_counts = {bucket["_id"]: bucket["count"] for bucket in result.get("price_ranges", [])}
+    price_ranges = [(label, bucket_counts.get(lower, 0)) for lower, label in PRICE_RANGES]
+
+    model_counts = {
+        group["_id"]: group["count"]
+        for group in result.get("model_counts", [])
+        if group["_id"] is not None
+    }
+    ingested = result.get("ingested") or [{}]
+
+    return {
+        "total": sum(group["count"] for group in result.get("series_counts", [])),
+        "series_counts": series_counts,
+        "price": price,
+        "price_by_series": price_by_series,
+        "price_ranges": price_ranges,
+        "model_counts": model_counts,
+        "top_models": top_models(model_counts),
+        "last_ingested": ingested[0].get("last"),
+    }
+
+
+class _NotFoldable(Exception):
+    """El resumen no se puede actualizar con exactitud: hay que volver a agregar"""
+
+
+def _price_range(price):
+    """Posición en PRICE_RANGES del rango de un precio"""
+    position = 0
+    for index, (lower, _) in enumerate(PRICE_RANGES):
+        if price >= lower:
+            position = index
+    return position
+
+
+def _fold_price(summary, price, sign):
+    """
+    Suma (sign=1) o resta (sign=-1) un precio a un resumen {count, sum, avg, min, max}.
+    Retorna el resumen actualizado (None si queda vacío). Quitar el mínimo o el máximo
+    deja de ser exacto: el nuevo extremo solo se conoce volviendo a agregar.
+    """
+    if summary is None:
+        if sign < 0:
+            raise _NotFoldable()
+        summary = {"count": 0, "sum": 0.0, "min": price, "max": price}
+    if "sum" not in summary:
+        raise _NotFoldable()
+    if sign < 0 and summary["count"] > 1 and price in (summary["min"], summary["max"]):
+        raise _NotFoldable()
+
+    summary["count"] += sign
+    if summary["count"] <= 0:
+        return None
+    summary["sum"] += sign * price
+    summary["avg"] = summary["sum"] / summary["count"]
+    if sign > 0:
+        summary["min"] = min(summary["min"], price)
+        summary["max"] = max(summary["max"], price)
+    return summary
+
+
+def _fold_count(counts, key, sign):
+    if key is None:
+        return
+    counts[key] = counts.get(key, 0) + sign
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def _fold_document(stats, document, sign):
+    """Suma o resta un documento (o una versión anterior) a todas las partes del resumen"""
+    series = document.get("series")
+    stats["total"] += sign
+    _fold_count(stats["series_counts"], series, sign)
+    _fold_count(stats["model_counts"], document.get("model_searched"), sign)
+
+    price = document.get("price_numeric") or 0
+    if price <= 0:
+        return
+    stats["price"] = _fold_price(stats["price"], price, sign)
+    if stats["price"] is not None:
+        stats["price"]["median"] = None  # Se vuelve a pedir al mostrarla
+    if series is not None:
+        by_series = _fold_price(stats["price_by_series"].get(series), price, sign)
+        if by_series is None:
+            stats["price_by_series"].pop(series, None)
+        else:
+            stats["price_by_series"][series] = by_series
+    position = _price_range(price)
+    label, count = stats["price_ranges"][position]
+    stats["price_ranges"][position] = (label, count + sign)
+
+
+def fold_documents(stats, documents, series=None):
+    """
+    Retorna las estadísticas `stats` (de fetch_dashboard_stats) con los documentos
+    nuevos o actualizados incluidos, sin consultar MongoDB: se suma cada documento y,
+    si es una actualización, se resta su versión anterior (campo 'previous' que guarda
+    upsert_listings). Los documentos necesitan _id, series, model_searched,
+    price_numeric, ingested_at y previous. La mediana queda en None.
+    Retorna None si el resultado no sería exacto (versión contada desconocida, o se
+    quitó un precio mínimo o máximo): entonces hay que volver a agregar.
+    """
+    counted_until = stats.get("last_ingested")  # Escrituras incluidas en la agregación
+    folded = dict(stats.get("folded", {}))      # _id -> ingested_at de lo sumado después
+
+    def counted(document_id, written):
+        """La versión escrita en `written` ya está en el resumen"""
+        if written is None:
+            return True  # Escrita antes de que existiera ingested_at: la agregación la incluyó
+        return (counted_until is not None and written <= counted_until) or folded.get(document_id) == written
+
+    stats = copy.deepcopy({key: value for key, value in stats.items() if key != "folded"})
+    try:
+        for document in documents:
+            if series and document.get("series") != series:
+                continue
+            written = document.get("ingested_at")
+            if written is not None and counted(document["_id"], written):
+                continue
+            if "previous" not in document:
+                raise _NotFoldable()  # Escrito por una versión del scraper sin 'previous'
+
+            previous = document["previous"]
+            if previous is not None:
+                if not counted(document["_id"], previous.get("ingested_at")):
+                    raise _NotFoldable()  # La versión incluida en el resumen es otra más vieja
+                if not series or previous.get("series") == series:
+                    _fold_document(stats, previous, -1)
+            _fold_document(stats, document, 1)
+            folded[document["_id"]] = written
+    except _NotFoldable:
+        return None
+
+    stats["top_models"] = top_models(stats["model_counts"])
+    stats["folded"] = folded
+    return stats
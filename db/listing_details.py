@@ -0,0 +1,83 @@
+# db/listing_details.py
+
+"""
+Caché de las especificaciones extraídas de la página de cada publicación.
+Se guarda por listing_id junto con el hash de contenido de la publicación y la fecha
+de descarga: una publicación solo se vuelve a visitar si es nueva, si su contenido
+cambió (título, precio...) o si sus especificaciones tienen más de `max_age_days`.
+"""
+
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from db.listings import content_hash
+
+LISTING_DETAILS_COLLECTION = "rtx_listing_details"
+
+
+def ensure_listing_details_collection(db):
+    """Retorna la colección de especificaciones con su índice único por listing_id"""
+    collection = db[LISTING_DETAILS_COLLECTION]
+    try:
+        collection.create_index("listing_id", unique=True)
+    except Exception as e:
+        print(f"⚠️ No se pudo crear el índice de '{LISTING_DETAILS_COLLECTION}': {e}")
+    return collection
+
+
+def listings_to_enrich(details_collection, documents, max_age_days=7):
+    """
+    Publicaciones con listing_id cuyas especificaciones faltan en la caché,
+    corresponden a otro contenido o están vencidas. Una sola vez por listing_id.
+    """
+    candidates = {}
+    for doc in documents:
+        if doc.get("listing_id"):
+            candidates[doc["listing_id"]] = doc
+    if not candidates:
+        return []
+
+    cached = {
+        entry["listing_id"]: entry
+        for entry in details_collection.find(
+            {"listing_id": {"$in": list(candidates)}},
+            {"listing_id": 1, "content_hash": 1, "fetched_at": 1, "_id": 0}
+        )
+    }
+
+    stale_before = datetime.now() - timedelta(days=max_age_days)
+    pending = []
+    for listing_id, doc in candidates.items():
+        entry = cached.get(listing_id)
+        if (entry is None or entry.get("content_hash") != content_hash(doc)
+                or entry.get("fetched_at") is None or entry["fetched_at"] < stale_before):
+            pending.append(doc)
+    return pending
+
+
+def save_listing_details(details_collection, listings_collection, enriched):
+    """
+    Guarda las especificaciones [(documento, detalles)] en la caché y las agrega al
+    documento guardado de cada publicación. Retorna la cantidad de publicaciones actualizadas.
+    """
+    if not enriched:
+        return 0
+
+    fetched_at = datetime.now()
+    cache_operations = []
+    listing_operations = []
+    for doc, details in enriched:
+        cache_operations.append(UpdateOne(
+            {"listing_id": doc["listing_id"]},
+            {"$set": {"content_hash": content_hash(doc), "details": details, "fetched_at": fetched_at}},
+            upsert=True
+        ))
+        listing_operations.append(UpdateOne(
+            {"listing_id": doc["listing_id"]},
+            {"$set": dict(details, details_fetched_at=fetched_at)}
+        ))
+
+    details_collection.bulk_write(cache_operations, ordered=False)
+    result = listings_collection.bulk_write(listing_operations, ordered=False)
+    return result.matched_count
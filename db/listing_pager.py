@@ -0,0 +1,129 @@
+# db/listing_pager.py
+
+"""
+Paginación por keyset de la colección de publicaciones.
+En lugar de skip/limit o de traer miles de documentos de una vez, cada página se
+pide a partir de la última clave (scraped_date, _id) leída, y solo con los
+campos que se muestran. La marca de agua para pedir después solo los documentos
+nuevos o actualizados es la fecha de escritura (ingested_at), no scraped_date: los
+productos re-extraídos del archivo se guardan con la fecha vieja de su página.
+"""
+
+
+class KeysetPager:
+    """
+    Recorre una colección ordenada por (scraped_date, _id) descendente, una página
+    a la vez. Cada llamada a fetch_next continúa donde terminó la anterior.
+    """
+
+    SORT = [("scraped_date", -1), ("_id", -1)]
+    # Fecha en que se escribió el documento en MongoDB (la marca de agua)
+    HIGH_WATER_FIELD = "ingested_at"
+
+    def __init__(self, collection, fields, query=None, page_size=50, newer_fields=()):
+        self.collection = collection
+        self.projection = {field: 1 for field in list(fields) + [self.HIGH_WATER_FIELD]}
+        # Campos que se leen además en fetch_newer (p. ej. para actualizar estadísticas)
+        self.newer_projection = dict(self.projection, **{field: 1 for field in newer_fields})
+        self.query = query or {}
+        self.page_size = page_size
+        self.last_key = None    # Clave del último documento leído
+        self.has_more = True
+        self.high_water = None  # ingested_at más reciente visto (marca de agua)
+        self._high_water_ids = set()  # _id de los documentos ya vistos con esa misma fecha
+        self._high_water_ready = False
+
+    @staticmethod
+    def document_key(document):
+        """Clave de orden de un documento: (scraped_date, _id)"""
+        return (document.get("scraped_date"), document["_id"])
+
+    def with_query(self, condition):
+        """Combina una condición de keyset con el filtro base del paginador"""
+        if not self.query:
+            return condition
+        return {"$and": [self.query, condition]}
+
+    def keyset_query(self):
+        """Filtro que selecciona los documentos posteriores a la última clave leída"""
+        if self.last_key is None:
+            return self.query
+
+        last_date, last_id = self.last_key
+        return self.with_query({"$or": [
+            {"scraped_date": {"$lt": last_date}},
+            {"scraped_date": last_date, "_id": {"$lt": last_id}},
+        ]})
+
+    def newer_query(self):
+        """
+        Filtro que selecciona los documentos escritos desde la marca de agua. Incluye
+        la propia marca: un lote escrito con la misma fecha puede verse a medias, y
+        los ya vistos se descartan por _id en fetch_newer.
+        """
+        if self.high_water is None:
+            return self.with_query({self.HIGH_WATER_FIELD: {"$ne": None}})
+        return self.with_query({self.HIGH_WATER_FIELD: {"$gte": self.high_water}})
+
+    def start_high_water_mark(self):
+        """Fija la marca de agua en la escritura más reciente de la colección (del filtro)"""
+        self._high_water_ready = True
+        latest = list(
+            self.collection.find(self.newer_query(), {self.HIGH_WATER_FIELD: 1})
+            .sort(self.HIGH_WATER_FIELD, -1).limit(1)
+        )
+        if not latest:
+            return
+        self.high_water = latest[0][self.HIGH_WATER_FIELD]
+        self._high_water_ids = {
+            doc["_id"]
+            for doc in self.collection.find(self.with_query({self.HIGH_WATER_FIELD: self.high_water}), {"_id": 1})
+        }
+
+    def fetch_next(self, limit=None):
+        """Retorna la siguiente página de documentos (lista vacía si no hay más)"""
+        if not self.has_more:
+            return []
+
+        if not self._high_water_ready:
+            # Antes de la primera página: lo escrito después es lo que traerá fetch_newer
+            self.start_high_water_mark()
+
+        limit = limit or self.page_size
+        cursor = self.collection.find(self.keyset_query(), self.projection).sort(self.SORT).limit(limit)
+        documents = list(cursor)
+
+        if len(documents) < limit:
+            self.has_more = False
+        if documents:
+            self.last_key = self.document_key(documents[-1])
+        return documents
+
+    def advance_high_water_mark(self, documents):
+        """
+        Mueve la marca de agua hasta el documento escrito más recientemente de
+        `documents` (leídos con fetch_newer o recibidos por otra vía, p. ej. el change stream).
+        """
+        for document in documents:
+            written = document.get(self.HIGH_WATER_FIELD)
+            if written is None:
+                continue
+            if self.high_water is None or written > self.high_water:
+                self.high_water = written
+                self._high_water_ids = {document["_id"]}
+            elif written == self.high_water:
+                self._high_water_ids.add(document["_id"])
+
+    def fetch_newer(self, limit=5000):
+        """
+        Retorna los documentos escritos después de la marca de agua (del más nuevo al
+        más viejo por scraped_date) y la avanza. Si se devuelven `limit` documentos
+        puede haber más: conviene recargar desde el principio.
+        """
+        cursor = self.collection.find(self.newer_query(), self.newer_projection).sort(self.SORT).limit(limit)
+        documents = [
+            doc for doc in cursor
+            if not (doc.get(self.HIGH_WATER_FIELD) == self.high_water and doc["_id"] in self._high_water_ids)
+        ]
+        self.advance_high_water_mark(documents)
+        return documents
@@ -0,0 +1,181 @@
+# db/listings.py
+
+"""
+Escritura de publicaciones en la colección de gráficas RTX.
+Cada publicación se guarda una sola vez (identificada por su listing_id o, si el
+enlace no trae uno, por su enlace sin parámetros de seguimiento en listing_link) y se
+actualiza con upserts en lote, en lugar de insertar una copia nueva en cada ejecución.
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from scrapper.listing_id import canonical_link
+
+# Imagen de MercadoLibre: .../D_NQ_NP_2X_812345-MLA80000001_102024-O.webp -> '812345-MLA80000001_102024'
+_PICTURE_ID = re.compile(r"(\d+-ML[A-Z]\d+_\d+)")
+
+
+def content_fields(document):
+    """
+    Campos que determinan si una publicación cambió: título, precio, imagen y enlace.
+    No cuentan la fecha ni la búsqueda que la encontró, y se normalizan las diferencias
+    entre ejecuciones que no son cambios: parámetros de seguimiento del enlace,
+    tamaño de la imagen y decimales del precio (el estado JSON los trae, la tarjeta no).
+    """
+    image = document.get("image_link") or ""
+    picture = _PICTURE_ID.search(image)
+    return {
+        "title": (document.get("title") or "").strip(),
+        "price": int(document.get("price_numeric") or 0),
+        "image": picture.group(1) if picture else canonical_link(image),
+        "link": canonical_link(document.get("post_link")),
+    }
+
+
+def content_hash(document):
+    """Hash de los campos de contenido de un documento"""
+    payload = json.dumps(content_fields(document), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# Campos de la versión anterior que se guardan en 'previous' al actualizar una
+# publicación: el dashboard resta esa versión de sus estadísticas y suma la nueva
+PREVIOUS_FIELDS = ("series", "model_searched", "price_numeric", "ingested_at")
+
+
+def identity_filter(document):
+    """
+    Filtro que identifica al documento en la colección: su listing_id o, para
+    enlaces sin ID de publicación, el enlace canónico (listing_link). Los enlaces de
+    catálogo traen un fragmento de seguimiento distinto en cada petición, por eso no
+    sirve el post_link tal cual. None si no tiene ninguno.
+    """
+    if document.get("listing_id"):
+        return {"listing_id": document["listing_id"]}
+    link = canonical_link(document.get("post_link"))
+    if link:
+        return {"listing_link": link}
+    return None
+
+
+def ensure_listing_indexes(collection):
+    """Crea los índices únicos por listing_id y por listing_link, y el índice de hash de contenido"""
+    try:
+        collection.create_index(
+            "listing_id",
+            unique=True,
+            partialFilterExpression={"listing_id": {"$type": "string"}},
+            name="listing_id_unique"
+        )
+        collection.create_index(
+            "listing_link",
+            unique=True,
+            partialFilterExpression={"listing_link": {"$type": "string"}},
+            name="listing_link_unique"
+        )
+        collection.create_index("content_hash")
+        return True
+    except Exception as e:
+        print(f"⚠️ No se pudo crear el índice único de 'listing_id' (¿hay duplicados? "
+              f"ejecuta la migración de setup_collections.py): {e}")
+        return False
+
+
+def identity_key(identity):
+    """Clave de un filtro de identidad: el listing_id o, si no hay, el enlace canónico"""
+    return identity.get("listing_id") or identity.get("listing_link")
+
+
+def date_key(value):
+    """Fecha comparable (texto ISO) de un scraped_date guardado como texto o datetime"""
+    if value is None:
+        return ""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def stored_versions(collection, identities):
+    """Hash de contenido y fecha de las publicaciones guardadas, por clave de identidad"""
+    ids = [identity["listing_id"] for identity in identities if identity.get("listing_id")]
+    links = [identity["listing_link"] for identity in identities if identity.get("listing_link")]
+    conditions = []
+    if ids:
+        conditions.append({"listing_id": {"$in": ids}})
+    if links:
+        conditions.append({"listing_link": {"$in": links}})
+    if not conditions:
+        return {}
+
+    projection = {"listing_id": 1, "listing_link": 1, "content_hash": 1, "scraped_date": 1, "_id": 0}
+    projection.update(dict.fromkeys(PREVIOUS_FIELDS, 1))
+    return {
+        identity_key(existing): existing
+        for existing in collection.find({"$or": conditions}, projection)
+    }
+
+
+def upsert_listings(collection, documents, batch_size=500):
+    """
+    Guarda las publicaciones con UpdateOne(upsert=True) en lotes no ordenados.
+    Las publicaciones cuyo contenido no cambió desde la última vez no se envían, y
+    tampoco las que ya están guardadas con una fecha más reciente (p. ej. al
+    re-extraer páginas archivadas viejas).
+    Cada documento escrito lleva ingested_at, la fecha de escritura: el dashboard la
+    usa como marca de agua (scraped_date puede ser vieja en páginas re-extraídas), y
+    previous, los PREVIOUS_FIELDS de la versión reemplazada (None si es nueva).
+    Retorna un diccionario con los contadores de insertadas, actualizadas,
+    sin cambios, antiguas y omitidas (sin ID ni enlace).
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "stale": 0, "skipped": 0}
+
+    # Una sola versión por publicación dentro del mismo lote (gana la más reciente)
+    pending = {}
+    for doc in documents:
+        identity = identity_filter(doc)
+        if identity is None:
+            stats["skipped"] += 1
+            continue
+        key = tuple(sorted((k, str(v)) for k, v in identity.items()))
+        if key in pending and date_key(pending[key][1].get("scraped_date")) > date_key(doc.get("scraped_date")):
+            continue
+        pending[key] = (identity, dict(doc, content_hash=content_hash(doc)))
+
+    items = list(pending.values())
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+
+        # Versión guardada de cada publicación del lote
+        stored = stored_versions(collection, [identity for identity, _ in batch])
+
+        ingested_at = datetime.now().isoformat()
+        operations = []
+        for identity, doc in batch:
+            existing = stored.get(identity_key(identity))
+            if existing is not None:
+                if date_key(existing.get("scraped_date")) > date_key(doc.get("scraped_date")):
+                    stats["stale"] += 1
+                    continue
+                if existing.get("content_hash") == doc["content_hash"]:
+                    stats["unchanged"] += 1
+                    continue
+            fields = {k: v for k, v in doc.items() if k != "_id"}
+            fields.update(identity, ingested_at=ingested_at)
+            fields["previous"] = (
+                {field: existing.get(field) for field in PREVIOUS_FIELDS} if existing is not None else None
+            )
+            operations.append(UpdateOne(
+                identity,
+                {"$set": fields, "$setOnInsert": {"first_seen": doc.get("scraped_date")}},
+                upsert=True
+            ))
+
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            stats["inserted"] += result.upserted_count
+            stats["updated"] += result.modified_count
+
+    return stats
@@ -0,0 +1,80 @@
+# db/price_history.py
+
+"""
+Historial de precios de las publicaciones.
+Cada observación (listing_id, timestamp, price_numeric) se guarda en una colección
+time-series de MongoDB, separada de la colección de publicaciones, que solo
+conserva el estado más reciente de cada una.
+"""
+
+from datetime import datetime
+
+from pymongo.errors import CollectionInvalid
+
+PRICE_HISTORY_COLLECTION = "rtx_price_history"
+
+
+def ensure_price_history_collection(db):
+    """Crea la colección time-series de precios si no existe y la retorna"""
+    try:
+        if PRICE_HISTORY_COLLECTION not in db.list_collection_names():
+            db.create_collection(
+                PRICE_HISTORY_COLLECTION,
+                timeseries={
+                    "timeField": "timestamp",
+                    "metaField": "listing_id",
+                    "granularity": "hours"
+                }
+            )
+            print(f"✅ Colección time-series '{PRICE_HISTORY_COLLECTION}' creada")
+    except CollectionInvalid:
+        # Otra instancia la creó al mismo tiempo
+        pass
+    except Exception as e:
+        print(f"⚠️ No se pudo crear la colección '{PRICE_HISTORY_COLLECTION}': {e}")
+
+    collection = db[PRICE_HISTORY_COLLECTION]
+    try:
+        collection.create_index([("listing_id", 1), ("timestamp", -1)])
+    except Exception as e:
+        print(f"⚠️ No se pudo crear el índice de '{PRICE_HISTORY_COLLECTION}': {e}")
+    return collection
+
+
+def to_observation(document):
+    """Convierte un documento de publicación en una observación de precio (None si no aplica)"""
+    listing_id = document.get("listing_id")
+    price = document.get("price_numeric")
+    scraped_date = document.get("scraped_date")
+    if not listing_id or not price or not scraped_date:
+        return None
+
+    if isinstance(scraped_date, str):
+        try:
+            scraped_date = datetime.fromisoformat(scraped_date.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+
+    return {"listing_id": listing_id, "timestamp": scraped_date, "price_numeric": float(price)}
+
+
+def record_price_observations(collection, documents, batch_size=1000):
+    """Inserta en lote una observación de precio por documento. Retorna cuántas se guardaron"""
+    observations = [obs for obs in map(to_observation, documents) if obs is not None]
+    for start in range(0, len(observations), batch_size):
+        collection.insert_many(observations[start:start + batch_size], ordered=False)
+    return len(observations)
+
+
+def get_price_trend(collection, listing_id, start=None, end=None):
+    """Retorna las observaciones de precio de una publicación ordenadas por fecha"""
+    query = {"listing_id": listing_id}
+    if start is not None or end is not None:
+        query["timestamp"] = {}
+        if start is not None:
+            query["timestamp"]["$gte"] = start
+        if end is not None:
+            query["timestamp"]["$lt"] = end
+
+    cursor = collection.find(query, {"_id": 0, "timestamp": 1, "price_numeric": 1}).sort("timestamp", 1)
+    return list(cursor)
@@ -41,11 +41,6 @@ def main(page: ft.Page):
     # Crear una instancia del Dashboard RTX
     rtx_dashboard = RTXDashboard()
     rtx_dashboard.page = page  # Asignar referencia de la página ANTES de cargar datos
-    
-    # Cargar datos después de asignar la página
-    if hasattr(rtx_dashboard, 'auto_load_data'):
-        rtx_dashboard.auto_load_data()
-        rtx_dashboard.update_statistics()  # Actualizar estadísticas después de cargar
 
     # Añadir el Dashboard a la página
     page.add(
@@ -60,12 +55,18 @@ def main(page: ft.Page):
     # Función para manejar el cierre de la aplicación
     def on_page_close(e):
         print("Cerrando aplicación Flet y conexión a MongoDB...")
+        rtx_dashboard.stop_watch()
         close_mongodb_connection()
         page.window_destroy()
 
     page.on_window_event = on_page_close
     page.update()
 
+    # Cargar datos y estadísticas en segundo plano: la ventana se muestra de
+    # inmediato con un indicador de carga mientras responde MongoDB
+    if hasattr(rtx_dashboard, 'auto_load_data'):
+        rtx_dashboard.auto_load_data()
+
 if __name__ == "__main__":
     print("🚀 Iniciando Dashboard de Gráficas RTX...")
     print("📋 Características:")
@@ -0,0 +1,113 @@
+# scrapper/benchmark_parsers.py
+
+"""
+Compara los backends de parseo HTML sobre las páginas guardadas en scrapper/fixtures/.
+Para cada backend instalado verifica que los documentos extraídos sean idénticos a
+los de BeautifulSoup y mide el tiempo de extracción por página. También mide la
+extracción desde el estado JSON incrustado en las páginas que lo traen.
+
+Uso:
+    python scrapper/benchmark_parsers.py [--repeat 50] [--archive [--pages 200]]
+
+Con --archive las páginas se toman del archivo local de páginas descargadas
+(data/page_archive) en lugar de scrapper/fixtures/.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper.embedded_state import find_state
+from scrapper.html_parsers import HTMLParser, available_backends
+from scrapper.listing_extractor import extract_search_page
+from scrapper.page_archive import PageArchive
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Fecha fija para que los documentos de distintos backends sean comparables
+FIXED_DATE = "2025-01-01T00:00:00"
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Retorna [(nombre de archivo, producto buscado, html)] según fixtures/index.json"""
+    with open(os.path.join(fixtures_dir, "index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+
+    pages = []
+    for filename, product_name in index.items():
+        with open(os.path.join(fixtures_dir, filename), encoding="utf-8") as f:
+            pages.append((filename, product_name, f.read()))
+    return pages
+
+
+def load_archive_pages(limit):
+    """Retorna [(URL, producto buscado, html)] de las últimas `limit` páginas del archivo"""
+    archive = PageArchive()
+    pages = []
+    for page in archive.pages()[-limit:]:
+        body = archive.load(page["sha256"], page["compression"])
+        pages.append((page["url"], page["product_name"] or "", body.decode(page["encoding"] or "utf-8", errors="replace")))
+    archive.close()
+    return pages
+
+
+def extract_all(pages, parser, use_state=False):
+    """Extrae los documentos de todas las páginas con `parser` (por defecto, solo con selectores CSS)"""
+    return [
+        extract_search_page(product_name, html, limit=None, parser=parser,
+                            scraped_date=FIXED_DATE, verbose=False, use_state=use_state)
+        for _, product_name, html in pages
+    ]
+
+
+def benchmark(pages, backend, repeat, use_state=False):
+    """Milisegundos promedio por página del backend"""
+    parser = HTMLParser(backend)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract_all(pages, parser, use_state)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (repeat * len(pages))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de backends de parseo HTML")
+    arg_parser.add_argument("--repeat", type=int, default=50, help="Repeticiones por página")
+    arg_parser.add_argument("--archive", action="store_true", help="Usar las páginas del archivo local")
+    arg_parser.add_argument("--pages", type=int, default=200, help="Páginas del archivo a usar")
+    args = arg_parser.parse_args()
+
+    pages = load_archive_pages(args.pages) if args.archive else load_fixtures()
+    if not pages:
+        print("📭 No hay páginas para comparar")
+        return
+    backends = available_backends()
+    print(f"📄 {len(pages)} páginas de prueba | Backends instalados: {', '.join(backends)}")
+
+    reference = extract_all(pages, HTMLParser("bs4"))
+    total_documents = sum(len(documents) for documents, _ in reference)
+    print(f"📦 {total_documents} publicaciones extraídas con BeautifulSoup\n")
+
+    base_ms = None
+    for backend in reversed(backends):  # bs4 primero, como referencia
+        identical = extract_all(pages, HTMLParser(backend)) == reference
+        ms_per_page = benchmark(pages, backend, args.repeat)
+        base_ms = base_ms or ms_per_page
+        print(f"{'✅' if identical else '❌'} {backend:<11} {ms_per_page:8.3f} ms/página "
+              f"({base_ms / ms_per_page:.1f}x) - documentos {'idénticos' if identical else 'DISTINTOS'}")
+
+    # Páginas con estado JSON: selectores CSS vs. decodificar el estado
+    state_pages = [page for page in pages if find_state(page[2]) is not None]
+    if state_pages:
+        css_ms = benchmark(state_pages, "bs4", args.repeat)
+        state_ms = benchmark(state_pages, "bs4", args.repeat, use_state=True)
+        print(f"\n🧾 Estado JSON ({len(state_pages)} páginas): {state_ms:8.3f} ms/página "
+              f"vs. {css_ms:.3f} con selectores CSS ({css_ms / state_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# scrapper/embedded_state.py
+
+"""
+Extracción de publicaciones desde el estado JSON que MercadoLibre incrusta en las
+páginas de resultados (__PRELOADED_STATE__). Decodificar un solo JSON es mucho más
+barato que recorrer el DOM con selectores por cada producto, y trae directamente
+el ID de la publicación y el precio con decimales.
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper.listing_id import extract_listing_id
+
+# <script id="__PRELOADED_STATE__" type="application/json">{...}</script>
+_STATE_SCRIPT = re.compile(
+    r'<script[^>]*\bid=["\']__PRELOADED_STATE__["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+# window.__PRELOADED_STATE__ = {...};
+_STATE_ASSIGNMENT = re.compile(r'__PRELOADED_STATE__\s*=\s*')
+_ITEM_ID = re.compile(r'^(MLP)-?(\d{6,})$', re.IGNORECASE)
+
+IMAGE_URL = "https://http2.mlstatic.com/D_NQ_NP_{}-O.webp"
+
+
+def find_state(html):
+    """Decodifica el estado incrustado en la página. None si no hay o no es JSON válido"""
+    try:
+        match = _STATE_SCRIPT.search(html)
+        if match:
+            return json.loads(match.group(1))
+
+        match = _STATE_ASSIGNMENT.search(html)
+        if match:
+            # raw_decode ignora lo que sigue al objeto (';', otras sentencias)
+            state, _ = json.JSONDecoder().raw_decode(html, match.end())
+            return state
+    except ValueError:
+        return None
+    return None
+
+
+def initial_state(state):
+    """Parte del estado con los resultados de la búsqueda"""
+    if not isinstance(state, dict):
+        return {}
+    page_state = state.get("pageState") or {}
+    return page_state.get("initialState") or state.get("initialState") or state
+
+
+def total_results(initial):
+    """Total de resultados de la búsqueda según el estado; None si no aparece"""
+    event_data = (initial.get("melidata_track") or {}).get("event_data") or {}
+    for total in (event_data.get("total"), (initial.get("pagination") or {}).get("total"), initial.get("total")):
+        if isinstance(total, int):
+            return total
+    return None
+
+
+def format_price(value):
+    """Precio como lo muestra la página ('2.499'): sin decimales, con punto de miles"""
+    return f"{int(value):,}".replace(",", ".")
+
+
+def _components(polycard):
+    """Componentes de la tarjeta indexados por tipo ('title', 'price', ...)"""
+    return {
+        component.get("type"): component
+        for component in polycard.get("components") or []
+        if isinstance(component, dict)
+    }
+
+
+def parse_result(result):
+    """
+    Campos de una publicación del estado (formato polycard o el formato anterior):
+    (id, título, precio, enlace, imagen). None si falta el título, el precio o el enlace.
+    """
+    polycard = result.get("polycard") or result
+    metadata = polycard.get("metadata") or {}
+    components = _components(polycard)
+
+    title = (components.get("title") or {}).get("title", {}).get("text") or result.get("title")
+
+    price = (components.get("price") or {}).get("price", {}).get("current_price", {}).get("value")
+    if price is None:
+        price_info = result.get("price")
+        price = price_info.get("amount") if isinstance(price_info, dict) else price_info
+
+    url = metadata.get("url") or result.get("permalink")
+    if url and not url.startswith("http"):
+        url = f"https://{url.lstrip('/')}"
+
+    pictures = (polycard.get("pictures") or {}).get("pictures") or []
+    image = IMAGE_URL.format(pictures[0]["id"]) if pictures and pictures[0].get("id") else result.get("thumbnail", "")
+
+    item_id = metadata.get("id") or result.get("id")
+    if not title or price is None or not url:
+        return None
+    return item_id, title, float(price), url, image or ""
+
+
+def extract_state_listings(product_name, html, series, limit=10, scraped_date=None):
+    """
+    Construye los documentos de la página a partir del estado incrustado.
+    Retorna (documentos, total de resultados) o None si la página no trae el estado
+    o el estado no tiene resultados (para usar los selectores CSS en su lugar).
+    """
+    initial = initial_state(find_state(html))
+    results = initial.get("results")
+    if not isinstance(results, list) or not results:
+        return None
+
+    scraped_date = scraped_date or datetime.now().isoformat()
+    documents = []
+    for result in results[:limit]:
+        if not isinstance(result, dict):
+            continue
+        try:
+            fields = parse_result(result)
+        except (AttributeError, TypeError, KeyError, ValueError):
+            fields = None  # Resultado con un formato inesperado
+        if fields is None:
+            continue
+        item_id, title, price, url, image = fields
+
+        id_match = _ITEM_ID.match(str(item_id or ""))
+        listing_id = f"{id_match.group(1).upper()}{id_match.group(2)}" if id_match else extract_listing_id(url)
+
+        documents.append({
+            "listing_id": listing_id,
+            "model_searched": product_name,
+            "title": title,
+            "price_text": format_price(price),
+            "price_numeric": price,
+            "series": series,
+            "post_link": url,
+            "image_link": image,
+            "scraped_date": scraped_date,
+            "country": "Peru",
+            "source": "MercadoLibre"
+        })
+
+    if not documents:
+        return None
+    return documents, total_results(initial)
@@ -0,0 +1,153 @@
+# scrapper/html_parsers.py
+
+"""
+Backends de parseo HTML para la extracción de publicaciones.
+Todos exponen la misma interfaz mínima (select, select_one, text, attr), así la
+extracción no depende de la librería. Se usa el backend más rápido instalado:
+selectolax (lexbor, en C) → lxml + cssselect → BeautifulSoup (siempre disponible).
+"""
+
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+# Orden de preferencia de los backends
+BACKEND_ORDER = ("selectolax", "lxml", "bs4")
+
+
+class SoupNode:
+    """Nodo de BeautifulSoup (html.parser)"""
+
+    backend = "bs4"
+
+    def __init__(self, node):
+        self.node = node
+
+    @classmethod
+    def parse(cls, html):
+        return cls(BeautifulSoup(html, 'html.parser'))
+
+    def select(self, css):
+        return [SoupNode(node) for node in self.node.select(css)]
+
+    def select_one(self, css):
+        node = self.node.select_one(css)
+        return SoupNode(node) if node is not None else None
+
+    def text(self):
+        return self.node.get_text(strip=True)
+
+    def attr(self, name, default=""):
+        value = self.node.get(name)
+        return default if value is None else value
+
+
+class LexborNode:
+    """Nodo de selectolax (parser lexbor, en C)"""
+
+    backend = "selectolax"
+
+    def __init__(self, node):
+        self.node = node
+
+    @classmethod
+    def parse(cls, html):
+        from selectolax.lexbor import LexborHTMLParser
+        return cls(LexborHTMLParser(html))
+
+    def select(self, css):
+        return [LexborNode(node) for node in self.node.css(css)]
+
+    def select_one(self, css):
+        node = self.node.css_first(css)
+        return LexborNode(node) if node is not None else None
+
+    def text(self):
+        # Igual que get_text(strip=True) de BeautifulSoup: cada texto sin espacios, unidos sin separador
+        return self.node.text(deep=True, separator="", strip=True)
+
+    def attr(self, name, default=""):
+        value = self.node.attributes.get(name)
+        return default if value is None else value
+
+
+@lru_cache(maxsize=128)
+def _css_selector(css):
+    """Selector CSS compilado a XPath (se compila una vez por selector)"""
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(css)
+
+
+class LxmlNode:
+    """Nodo de lxml.html (en C), con selectores CSS de cssselect"""
+
+    backend = "lxml"
+
+    def __init__(self, node):
+        self.node = node
+
+    @classmethod
+    def parse(cls, html):
+        import lxml.html
+        return cls(lxml.html.document_fromstring(html))
+
+    def select(self, css):
+        return [LxmlNode(node) for node in _css_selector(css)(self.node)]
+
+    def select_one(self, css):
+        nodes = _css_selector(css)(self.node)
+        return LxmlNode(nodes[0]) if nodes else None
+
+    def text(self):
+        return "".join(part.strip() for part in self.node.xpath(".//text()"))
+
+    def attr(self, name, default=""):
+        value = self.node.get(name)
+        return default if value is None else value
+
+
+_NODE_CLASSES = {"selectolax": LexborNode, "lxml": LxmlNode, "bs4": SoupNode}
+
+
+def backend_available(name):
+    """True si las librerías del backend están instaladas"""
+    try:
+        if name == "selectolax":
+            import selectolax.lexbor  # noqa: F401
+        elif name == "lxml":
+            import lxml.html  # noqa: F401
+            import cssselect  # noqa: F401
+        return name in _NODE_CLASSES
+    except ImportError:
+        return False
+
+
+def available_backends():
+    """Backends instalados, del más rápido al más lento"""
+    return [name for name in BACKEND_ORDER if backend_available(name)]
+
+
+class HTMLParser:
+    """
+    Parsea páginas con el backend elegido (o el más rápido instalado). Si el
+    backend rápido falla con una página, esa página se parsea con BeautifulSoup.
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = available_backends()[0]
+        elif not backend_available(backend):
+            print(f"⚠️ Parser '{backend}' no instalado, se usa BeautifulSoup")
+            backend = "bs4"
+        self.backend = backend
+        self.node_class = _NODE_CLASSES[backend]
+
+    def parse(self, html):
+        """Retorna el nodo raíz del documento"""
+        try:
+            return self.node_class.parse(html)
+        except Exception as e:
+            if self.node_class is SoupNode:
+                raise
+            print(f"⚠️ Error parseando con {self.backend} ({e}), se usa BeautifulSoup")
+            return SoupNode.parse(html)
@@ -0,0 +1,127 @@
+# scrapper/http_cache.py
+
+"""
+Caché HTTP en disco para las páginas de búsqueda.
+Por cada URL guarda el ETag, el Last-Modified, el hash del contenido y los documentos
+extraídos. Las peticiones siguientes son condicionales (If-None-Match /
+If-Modified-Since): si el servidor responde 304, o responde 200 con el mismo
+contenido, se reutilizan los documentos sin volver a parsear la página.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "http_cache.sqlite")
+
+
+def body_hash(body):
+    """Hash SHA-256 del contenido de una respuesta"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class HTTPCache:
+    """Validadores HTTP y documentos extraídos por URL, con contadores por ejecución"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                total_results INTEGER,
+                documents TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._db.commit()
+        self.stats = {"requests": 0, "not_modified": 0, "same_body": 0, "bytes_saved": 0}
+
+    def _entry(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, sha256, size, total_results, documents "
+                "FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("etag", "last_modified", "sha256", "size", "total_results", "documents")
+        return dict(zip(keys, row))
+
+    def conditional_headers(self, url):
+        """Cabeceras para una petición condicional de `url` (vacío si no está en caché)"""
+        entry = self._entry(url)
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_response(self, url, status_code):
+        """Cuenta una respuesta (304 = contenido no descargado)"""
+        with self._lock:
+            self.stats["requests"] += 1
+        if status_code == 304:
+            entry = self._entry(url)
+            with self._lock:
+                self.stats["not_modified"] += 1
+                self.stats["bytes_saved"] += entry["size"] if entry else 0
+
+    def cached_page(self, url, body=None, limit=10):
+        """
+        Documentos guardados de `url` si siguen siendo válidos: respuesta 304 (body=None)
+        o contenido con el mismo hash. Retorna (primeros `limit` documentos, total) o None.
+        """
+        entry = self._entry(url)
+        if entry is None:
+            return None
+        if body is not None:
+            if body_hash(body) != entry["sha256"]:
+                return None
+            with self._lock:
+                self.stats["same_body"] += 1
+
+        documents = json.loads(entry["documents"])
+        # Misma página, nueva observación: solo cambia la fecha
+        scraped_date = datetime.now().isoformat()
+        for doc in documents:
+            doc["scraped_date"] = scraped_date
+        return documents[:limit], entry["total_results"]
+
+    def store(self, url, headers, body, documents, total_results):
+        """Guarda los validadores de la respuesta y todos los documentos extraídos de ella"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url, etag, last_modified, sha256, size, total_results, documents, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, headers.get("ETag"), headers.get("Last-Modified"), body_hash(body), len(body),
+                 total_results, json.dumps(documents, ensure_ascii=False, default=str),
+                 datetime.now().isoformat())
+            )
+            self._db.commit()
+
+    def print_summary(self):
+        """Muestra la tasa de aciertos de la caché y los bytes no descargados en esta ejecución"""
+        stats = self.stats
+        if not stats["requests"]:
+            return
+        hits = stats["not_modified"] + stats["same_body"]
+        print(f"🗄️ Caché HTTP: {hits / stats['requests']:.0%} de aciertos "
+              f"({stats['not_modified']} respuestas 304, {stats['same_body']} páginas sin cambios) | "
+              f"{stats['bytes_saved'] / (1024 * 1024):.2f} MB no descargados")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
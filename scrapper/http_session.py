@@ -0,0 +1,101 @@
+# scrapper/http_session.py
+
+"""
+Sesión HTTP compartida para el scraper.
+Mantiene un pool de conexiones keep-alive hacia MercadoLibre para que cada
+búsqueda reutilice una conexión abierta en lugar de repetir el handshake TCP/TLS.
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter con pool configurable que cuenta conexiones nuevas vs. reutilizadas.
+
+    - pool_connections: cantidad de hosts distintos que se mantienen en el pool
+    - pool_maxsize: conexiones abiertas como máximo por host
+    - keep_alive_timeout: segundos de inactividad tras los cuales se descartan las
+      conexiones (el servidor las habrá cerrado de todas formas); None = nunca
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, keep_alive_timeout=30, **kwargs):
+        self.keep_alive_timeout = keep_alive_timeout
+        self._last_used = None
+        self._retired_connections = 0
+        self._retired_requests = 0
+        self._stats_lock = threading.Lock()
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+
+    def send(self, request, **kwargs):
+        self._expire_idle_connections()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            self._last_used = time.monotonic()
+
+    def close(self):
+        with self._stats_lock:
+            self._retire_pools()
+        super().close()
+
+    def _expire_idle_connections(self):
+        """Descarta las conexiones si el pool estuvo inactivo más de keep_alive_timeout"""
+        if self.keep_alive_timeout is None or self._last_used is None:
+            return
+        with self._stats_lock:
+            if time.monotonic() - self._last_used >= self.keep_alive_timeout:
+                self._retire_pools()
+
+    def _retire_pools(self):
+        """Guarda los contadores de los pools actuales y los cierra"""
+        new_connections, total_requests = self._pool_counters()
+        self._retired_connections += new_connections
+        self._retired_requests += total_requests
+        self.poolmanager.clear()
+
+    def _pool_counters(self):
+        """Suma las conexiones creadas y peticiones hechas por los pools activos"""
+        new_connections = 0
+        total_requests = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                new_connections += pool.num_connections
+                total_requests += pool.num_requests
+        return new_connections, total_requests
+
+    def connection_stats(self):
+        """Retorna un diccionario con las conexiones nuevas, reutilizadas y el total de peticiones"""
+        with self._stats_lock:
+            new_connections, total_requests = self._pool_counters()
+            new_connections += self._retired_connections
+            total_requests += self._retired_requests
+        return {
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused_connections": max(total_requests - new_connections, 0),
+        }
+
+
+class PooledSession(requests.Session):
+    """Sesión de requests de larga duración que usa un PooledHTTPAdapter para http y https"""
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, keep_alive_timeout=30):
+        super().__init__()
+        self.adapter = PooledHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            keep_alive_timeout=keep_alive_timeout
+        )
+        self.mount("https://", self.adapter)
+        self.mount("http://", self.adapter)
+
+    def connection_stats(self):
+        """Contadores de conexiones del pool (ver PooledHTTPAdapter.connection_stats)"""
+        return self.adapter.connection_stats()
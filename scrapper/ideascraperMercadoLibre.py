@@ -1,21 +1,96 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
-from datetime import datetime
+from urllib.parse import urlsplit
+
+import requests
 
 # Agregar el directorio padre al path para importar módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.mongo_config import connect_to_mongodb, close_mongodb_connection
+from db.listing_details import ensure_listing_details_collection, listings_to_enrich, save_listing_details
+from db.listings import ensure_listing_indexes, upsert_listings
+from db.price_history import ensure_price_history_collection, record_price_observations
+from scrapper.html_parsers import HTMLParser
+from scrapper.http_cache import HTTPCache
+from scrapper.http_session import PooledSession
+from scrapper.item_details import extract_item_details, item_url
+from scrapper.listing_extractor import extract_search_page, search_selector_registry
+from scrapper.listing_id import listing_key
+from scrapper.page_archive import PageArchive
+from scrapper.parse_pipeline import ParsePipeline
+from scrapper.query_planner import QueryPlanner
+from scrapper.rate_limiter import RETRY_STATUS, HostRateLimiter, backoff_delay, parse_retry_after
+from scrapper.selector_registry import STATS_PATH
+from utils.exporter import export_collection
 
 class Scraper():
 
-    def __init__(self):
+    def __init__(self, max_concurrency=8, pool_connections=4, pool_maxsize=None, keep_alive_timeout=30,
+                 parser_backend=None, parse_workers=0, archive_pages=False, http_cache=False,
+                 requests_per_second=2.0, max_retries=3, enrich_details=False, detail_concurrency=4,
+                 details_max_age_days=7, request_timeout=(5, 30)):
         # Fijamos Perú como único país
         self.base_url = 'https://listado.mercadolibre.com.pe/'
         print("Scraper configurado para Perú")
         
+        # Headers para simular un navegador real
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
+        # Número máximo de búsquedas simultáneas en modo asíncrono
+        self.max_concurrency = max_concurrency
+        
+        # Tope de peticiones en curso entre todas las búsquedas (primeras páginas,
+        # páginas siguientes y páginas de publicaciones): no supera el pool de conexiones
+        self._request_slots = threading.BoundedSemaphore(max_concurrency)
+        # Hilos compartidos por todos los modelos para descargar las páginas siguientes
+        self.page_executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="pages")
+        
+        # Sesión HTTP compartida: reutiliza conexiones keep-alive entre búsquedas.
+        # Por defecto hay tantas conexiones por host como búsquedas simultáneas.
+        self.session = PooledSession(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or max_concurrency,
+            keep_alive_timeout=keep_alive_timeout
+        )
+        self.session.headers.update(self.headers)
+        
+        # Ritmo de peticiones por host: token bucket que se adapta a los 429/5xx (AIMD)
+        # y reintentos con backoff exponencial
+        self.rate_limiter = HostRateLimiter(rate=requests_per_second)
+        self.max_retries = max_retries
+        # Tiempo máximo (conexión, lectura) en segundos: una respuesta colgada no retiene
+        # para siempre un cupo de peticiones ni una conexión del pool
+        self.request_timeout = request_timeout
+        
+        # Parser HTML: el más rápido instalado (selectolax, lxml) o BeautifulSoup
+        self.parser = HTMLParser(parser_backend)
+        print(f"🧩 Parser HTML: {self.parser.backend}")
+        
+        # Selectores CSS ordenados por tasa de aciertos (estadísticas en data/selector_stats.json)
+        self.selectors = search_selector_registry(STATS_PATH)
+        
+        # Archivo local de las páginas descargadas (para volver a extraerlas sin red)
+        self.archive = PageArchive() if archive_pages else None
+        if self.archive is not None:
+            print(f"🗃️ Guardando las páginas descargadas en {self.archive.root} ({self.archive.compression})")
+        
+        # Caché HTTP: peticiones condicionales y documentos de las páginas sin cambios
+        self.http_cache = HTTPCache() if http_cache else None
+        if self.http_cache is not None:
+            print(f"🗄️ Caché HTTP en {self.http_cache.path}")
+        
+        # Pool de procesos para parsear páginas (0 = parsear en el mismo hilo que descarga)
+        self.parse_pipeline = None
+        if parse_workers:
+            self.start_parse_pool(parse_workers)
+        
         # Conectar a MongoDB
         self.db = connect_to_mongodb()
         if self.db is None:
@@ -27,6 +102,19 @@ class Scraper():
         self.collection = self.db[self.collection_name]
         print(f"📁 Usando colección: {self.collection_name}")
         
+        # Índice único por publicación para los upserts
+        ensure_listing_indexes(self.collection)
+        
+        # Colección time-series con una observación de precio por publicación y ejecución
+        self.price_history = ensure_price_history_collection(self.db)
+        
+        # Especificaciones de la página de cada publicación (VRAM, marca, vendedor...):
+        # solo se visitan las publicaciones nuevas, cambiadas o con datos vencidos
+        self.enrich_details = enrich_details
+        self.detail_concurrency = detail_concurrency
+        self.details_max_age_days = details_max_age_days
+        self.listing_details = ensure_listing_details_collection(self.db)
+        
         # Lista de gráficas RTX serie 40 y 50 a scrapear
         self.rtx_models = [
             # Serie RTX 40
@@ -39,197 +127,501 @@ class Scraper():
             "GeForce RTX 5070", "GeForce RTX 5060 Ti", "GeForce RTX 5060"
         ]
         
+        # Paginación: resultados por página y presupuesto por modelo
+        self.page_size = 50
+        self.max_pages = 10
+        self.max_items = 500
+        
+        # Planificador que descarta búsquedas redundantes según el historial
+        self.query_planner = QueryPlanner(self.db["scraper_query_runs"])
+        
         # Lista para almacenar todos los datos
         self.data = []
 
-    def scrape_all_rtx_models(self):
-        """Scrapea todas las gráficas RTX serie 40 y 50"""
+    def scrape_all_rtx_models(self, async_mode=False, paginate=False, plan_queries=True):
+        """
+        Scrapea todas las gráficas RTX serie 40 y 50.
+        Con plan_queries=True se omiten las búsquedas cuyos resultados ya quedan
+        cubiertos por otra búsqueda según las ejecuciones anteriores.
+        """
         print("Iniciando scraping de todas las gráficas RTX serie 40 y 50...")
         
-        for model in self.rtx_models:
-            print(f"\n=== Scrapeando: {model} ===")
-            self.scraping_single_model(model)
+        models = self.rtx_models
+        plan = None
+        if plan_queries:
+            plan = self.query_planner.plan(self.rtx_models)
+            plan.print_summary()
+            models = plan.queries
+        
+        first_index = len(self.data)
+        
+        if async_mode:
+            print(f"⚡ Modo asíncrono: hasta {self.max_concurrency} búsquedas simultáneas")
+            asyncio.run(self.scrape_models_async(models, paginate=paginate))
+        else:
+            for model in models:
+                print(f"\n=== Scrapeando: {model} ===")
+                self.scraping_single_model(model, paginate=paginate)
+        
+        if plan is not None:
+            self.query_planner.record_run(plan, self.listing_ids_by_query(models, self.data[first_index:]))
             
+        self.deduplicate_data()
         print(f"\nScraping completado. Total de productos encontrados: {len(self.data)}")
+        if plan is not None and plan.saved_requests:
+            print(f"🧭 Búsquedas ahorradas por el planificador: {plan.saved_requests}")
+        self.print_connection_stats()
+        self.rate_limiter.print_summary()
+        if self.http_cache is not None:
+            self.http_cache.print_summary()
+        self.selectors.print_summary()
+
+    def listing_ids_by_query(self, queries, documents):
+        """Agrupa los IDs de publicación encontrados por cada búsqueda"""
+        results = {query: set() for query in queries}
+        for doc in documents:
+            listing_id = doc.get("listing_id")
+            if listing_id and doc.get("model_searched") in results:
+                results[doc["model_searched"]].add(listing_id)
+        return results
 
-    def scraping_single_model(self, product_name):
-        """Scrapea un modelo específico de gráfica"""
-        # Crear URL de búsqueda
+    def deduplicate_data(self):
+        """Elimina de self.data las publicaciones repetidas entre búsquedas (conserva la primera)"""
+        seen_keys = set()
+        unique_documents = []
+        for doc in self.data:
+            key = listing_key(doc)
+            if key and key in seen_keys:
+                continue
+            seen_keys.add(key)
+            unique_documents.append(doc)
+        
+        removed = len(self.data) - len(unique_documents)
+        if removed:
+            print(f"🧹 {removed} publicaciones duplicadas entre búsquedas eliminadas")
+        self.data = unique_documents
+
+    async def scrape_models_async(self, models, max_concurrency=None, paginate=False):
+        """
+        Descarga las páginas de búsqueda de varios modelos de forma concurrente.
+        Las peticiones (bloqueantes) se ejecutan en hilos limitados por un semáforo,
+        y cada página se procesa en cuanto llega, sin esperar a las demás ni al
+        procesamiento de otra. El procesamiento (parseo y, con paginate=True, las páginas
+        siguientes) corre en un hilo para no bloquear las descargas del resto.
+        Retorna el total de productos encontrados.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def fetch_and_process(model):
+            url = self.build_search_url(model)
+            async with semaphore:
+                response = await asyncio.to_thread(self.fetch_page, url, model)
+            print(f"\n=== Procesando: {model} ===")
+            # Cada modelo en su hilo: los parseos de páginas que llegan juntas corren a la vez
+            # (en el pool de procesos si está activo) y no bloquean las descargas del resto
+            return await asyncio.to_thread(self.process_response, model, response, paginate)
+
+        counts = await asyncio.gather(*(fetch_and_process(model) for model in models))
+        return sum(counts)
+
+    def build_search_url(self, product_name, offset=0):
+        """
+        Construye la URL de búsqueda de MercadoLibre para un producto.
+        offset es la cantidad de resultados a saltar (paginación con '_Desde_N').
+        """
         search_query = product_name.replace(" ", "%20")
-        url = f"https://listado.mercadolibre.com.pe/{search_query}"
+        if offset:
+            return f"{self.base_url}{search_query}_Desde_{offset + 1}_NoIndex_True"
+        return f"{self.base_url}{search_query}"
+
+    def fetch_page(self, url, product_name=None, search_page=True):
+        """
+        Descarga una página respetando el ritmo del host. Las respuestas 429/5xx, los
+        errores de conexión y los tiempos de espera agotados (request_timeout) bajan la
+        tasa del host y se reintentan hasta max_retries veces con backoff. Retorna la
+        respuesta HTTP (la última, si se agotaron los reintentos) o None si falla la conexión.
+        Con la caché HTTP activa la petición es condicional (puede responder 304).
+        Las páginas de publicaciones (search_page=False) no pasan por la caché ni el archivo.
+        """
+        host = urlsplit(url).netloc
+        use_cache = search_page and self.http_cache is not None
+        headers = self.http_cache.conditional_headers(url) if use_cache else None
+        response = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._request_slots:
+                    self.rate_limiter.acquire(host)
+                    response = self.session.get(url, headers=headers, timeout=self.request_timeout)
+            except Exception as e:
+                # Un timeout es señal de host saturado, igual que un 429: se baja su tasa
+                self.rate_limiter.on_throttle(host)
+                error = "Tiempo de espera agotado" if isinstance(e, requests.Timeout) else "Error"
+                if attempt == self.max_retries:
+                    print(f"❌ {error} accediendo a la página {url}: {e}")
+                    return None
+                delay = backoff_delay(attempt)
+                print(f"⚠️ {error} accediendo a {url}: {e}. Reintentando en {delay:.1f} s")
+                time.sleep(delay)
+                continue
+            
+            if response.status_code not in RETRY_STATUS:
+                self.rate_limiter.on_success(host)
+                break
+            
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.rate_limiter.on_throttle(host, retry_after)
+            if attempt == self.max_retries:
+                break
+            delay = max(retry_after or 0, backoff_delay(attempt))
+            print(f"⏳ HTTP {response.status_code} en {url}: reintento {attempt + 1}/{self.max_retries} "
+                  f"en {delay:.1f} s (ritmo {self.rate_limiter.rate(host):.2f} peticiones/s)")
+            time.sleep(delay)
+        
+        if use_cache:
+            self.http_cache.record_response(url, response.status_code)
+        
+        if search_page and self.archive is not None and response.status_code == 200:
+            try:
+                self.archive.store(url, response.content, product_name, response.encoding)
+            except Exception as e:
+                print(f"⚠️ No se pudo archivar la página {url}: {e}")
+        return response
+
+    def scraping_single_model(self, product_name, paginate=False):
+        """
+        Scrapea un modelo específico de gráfica.
+        Con paginate=True recorre también las páginas siguientes de resultados
+        (hasta max_pages / max_items) en lugar de quedarse con los 10 primeros.
+        """
+        url = self.build_search_url(product_name)
         
         print(f"🔍 Buscando: {product_name}")
         print(f"🌐 URL: {url}")
         
+        response = self.fetch_page(url, product_name)
+        return self.process_response(product_name, response, paginate)
+
+    def process_response(self, product_name, response, paginate=False):
+        """Procesa la respuesta de una búsqueda y agrega los productos a self.data"""
         # Contador para este modelo
         model_count = 0
         
-        try:
-            # Headers para simular un navegador real
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            # Obtener el HTML de la página
-            response = requests.get(url, headers=headers)
+        if response is not None:
             print(f"📡 Código de respuesta: {response.status_code}")
             
-            if response.status_code != 200:
+            if not self.page_ok(response):
                 print(f"❌ Error HTTP: {response.status_code}")
                 return model_count
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Buscar elementos de producto con diferentes selectores
-            content = soup.select('li.ui-search-layout__item')
-            
-            if not content:
-                # Intentar con otros selectores
-                content = soup.select('.ui-search-result')
-                
-            if not content:
-                print(f"❌ No se encontraron productos para {product_name}")
-                return model_count
-            
-            print(f"📦 Productos encontrados: {len(content)}")
-            
-            # Procesar máximo 10 productos por modelo
-            for i, post in enumerate(content[:10]):
-                try:
-                    # Buscar título
-                    title_element = post.select_one('.poly-component__title a')
-                    if not title_element:
-                        title_element = post.select_one('h2 a')
-                    if not title_element:
-                        title_element = post.select_one('.ui-search-item__title')
-                    if not title_element:
-                        title_element = post.select_one('a[class*="title"]')
-                    
-                    if title_element:
-                        title = title_element.get_text(strip=True)
-                        print(f"   📝 Título: {title[:50]}...")
-                    else:
-                        print("   ❌ No se encontró título")
-                        continue
-                    
-                    # Buscar precio
-                    price_element = post.select_one('.andes-money-amount__fraction')
-                    if not price_element:
-                        price_element = post.select_one('.price-tag-fraction')
-                    if not price_element:
-                        price_element = post.select_one('[class*="price"][class*="fraction"]')
-                    
-                    if price_element:
-                        price = price_element.get_text(strip=True)
-                        print(f"   💰 Precio: {price}")
-                    else:
-                        print("   ❌ No se encontró precio")
-                        continue
-                    
-                    # Buscar enlace
-                    link_element = post.select_one('.poly-component__title a')
-                    if not link_element:
-                        link_element = post.select_one('h2 a')
-                    if not link_element:
-                        link_element = post.select_one('a')
-                    
-                    post_link = ""
-                    if link_element and link_element.get("href"):
-                        post_link = link_element["href"]
-                        if not post_link.startswith('http'):
-                            post_link = f"https://mercadolibre.com.pe{post_link}"
-                        print(f"   🔗 Enlace encontrado")
-                    
-                    # Buscar imagen
-                    img_element = post.select_one('.poly-component__picture')
-                    if not img_element:
-                        img_element = post.select_one('img')
-                    
-                    img_link = ""
-                    if img_element:
-                        img_link = img_element.get("data-src", "") or img_element.get("src", "")
-                        print(f"   🖼️ Imagen encontrada")
-                    
-                    # Procesar precio
-                    price_clean = price.replace(",", "").replace(".", "").replace("S/", "").strip()
-                    try:
-                        price_numeric = float(price_clean)
-                    except:
-                        price_numeric = 0
-                    
-                    # Determinar serie
-                    if any(x in product_name for x in ["40", "4060", "4070", "4080", "4090"]):
-                        series = "RTX 40"
-                    elif any(x in product_name for x in ["50", "5060", "5070", "5080", "5090"]):
-                        series = "RTX 50"
-                    else:
-                        series = "RTX"
-                    
-                    # Crear documento
-                    post_data = {
-                        "model_searched": product_name,
-                        "title": title,
-                        "price_text": price,
-                        "price_numeric": price_numeric,
-                        "series": series,
-                        "post_link": post_link,
-                        "image_link": img_link,
-                        "scraped_date": datetime.now().isoformat(),
-                        "country": "Peru",
-                        "source": "MercadoLibre"
-                    }
-                    
-                    self.data.append(post_data)
-                    model_count += 1
-                    
-                    print(f"   ✅ Producto {model_count}: {title[:50]}... - {price}")
-                    
-                except Exception as e:
-                    print(f"   ❌ Error procesando producto {i+1}: {e}")
-                    continue
-                    
-        except Exception as e:
-            print(f"❌ Error accediendo a la página: {e}")
+            try:
+                if paginate:
+                    documents, total_results = self.parse_response(product_name, response, limit=None)
+                    documents = self.crawl_following_pages(product_name, documents, total_results)
+                else:
+                    documents, _ = self.parse_response(product_name, response)
+                self.data.extend(documents)
+                model_count = len(documents)
+            except Exception as e:
+                print(f"❌ Error procesando la página: {e}")
         
         print(f"📊 Total encontrados para {product_name}: {model_count}")
         return model_count
 
+    def crawl_following_pages(self, product_name, documents, total_results):
+        """
+        Descarga las páginas siguientes de una búsqueda a partir de los documentos
+        de la primera página. Conocido el total de resultados, las páginas se piden
+        en paralelo por tandas de max_concurrency; se detiene en cuanto una página
+        no trae publicaciones nuevas o se alcanza el presupuesto max_items.
+        """
+        documents = documents[:self.max_items]
+        seen_keys = {listing_key(doc) for doc in documents}
+        
+        # Sin total conocido se usa el presupuesto como tope
+        target_items = min(total_results or self.max_items, self.max_items)
+        page_count = min(self.max_pages, math.ceil(target_items / self.page_size))
+        offsets = [page * self.page_size for page in range(1, page_count)]
+        
+        if not offsets:
+            return documents
+        
+        print(f"📄 Paginando {product_name}: {len(offsets)} páginas adicionales "
+              f"({total_results if total_results else '?'} resultados en total)")
+        
+        for start in range(0, len(offsets), self.max_concurrency):
+            batch = offsets[start:start + self.max_concurrency]
+            urls = [self.build_search_url(product_name, offset) for offset in batch]
+            responses = list(self.page_executor.map(self.fetch_page, urls, [product_name] * len(urls)))
+            
+            # Procesar en orden de página para cortar en la primera sin novedades
+            for offset, page_documents in zip(batch, self.parse_responses(product_name, responses)):
+                new_documents = [doc for doc in page_documents if listing_key(doc) not in seen_keys]
+                if not new_documents:
+                    print(f"⏹️ Página desde {offset + 1} sin publicaciones nuevas, fin de la paginación")
+                    return documents
+                
+                seen_keys.update(listing_key(doc) for doc in new_documents)
+                documents.extend(new_documents)
+                
+                if len(documents) >= self.max_items:
+                    print(f"⏹️ Presupuesto de {self.max_items} productos alcanzado")
+                    return documents[:self.max_items]
+        
+        return documents
+
+    def start_parse_pool(self, workers=None):
+        """Parsea las páginas en un pool de procesos (por defecto, uno por núcleo)"""
+        if self.parse_pipeline is None:
+            self.parse_pipeline = ParsePipeline(
+                workers, parser_backend=self.parser.backend, selectors=self.selectors
+            )
+            print(f"⚙️ Parseo en {self.parse_pipeline.workers} procesos "
+                  f"(máximo {self.parse_pipeline.max_pending} páginas en espera)")
+
+    def page_ok(self, response):
+        """Respuesta con página utilizable: 200, o 304 si la página está en la caché HTTP"""
+        if response is None:
+            return False
+        return response.status_code == 200 or (response.status_code == 304 and self.http_cache is not None)
+
+    @staticmethod
+    def requested_url(response):
+        """URL pedida originalmente (antes de las redirecciones): la clave de la caché HTTP"""
+        return response.history[0].url if response.history else response.url
+
+    def cached_response(self, response, limit=10):
+        """
+        Documentos de la caché HTTP para una respuesta 304 o con el mismo contenido que
+        la última vez (sin parsear la página). Retorna (documentos, total) o None.
+        """
+        if self.http_cache is None:
+            return None
+        body = None if response.status_code == 304 else response.content
+        return self.http_cache.cached_page(self.requested_url(response), body, limit)
+
+    def cache_response(self, response, documents, total_results):
+        """Guarda en la caché HTTP los documentos de todos los productos de una página"""
+        if self.http_cache is not None and documents:
+            self.http_cache.store(
+                self.requested_url(response), response.headers, response.content, documents, total_results
+            )
+
+    def parse_response(self, product_name, response, limit=10):
+        """
+        Extrae los productos de una respuesta HTTP. Con el pool de procesos activo
+        se le entrega el HTML crudo (bytes) y se espera el resultado.
+        Con la caché HTTP, una página sin cambios no se vuelve a parsear.
+        Retorna (documentos, total de resultados de la búsqueda o None).
+        """
+        cached = self.cached_response(response, limit)
+        if cached is not None:
+            return cached
+        
+        # Con caché se guardan todos los productos de la página, aunque se pidan menos
+        parse_limit = None if self.http_cache is not None else limit
+        if self.parse_pipeline is not None:
+            documents, total_results = self.parse_pipeline.parse(
+                product_name, response.content, response.encoding, parse_limit
+            )
+        else:
+            documents, total_results = self.parse_search_page(product_name, response.text, parse_limit)
+        self.cache_response(response, documents, total_results)
+        return documents[:limit], total_results
+
+    def parse_responses(self, product_name, responses):
+        """
+        Documentos de cada respuesta de una tanda (lista vacía si la descarga falló).
+        Con el pool de procesos las páginas se parsean en paralelo; sin él, una a una
+        a medida que se recorren. Las páginas de la caché HTTP no se parsean.
+        """
+        valid = [self.page_ok(response) for response in responses]
+        if self.parse_pipeline is None:
+            return (
+                self.parse_response(product_name, response, limit=None)[0] if ok else []
+                for response, ok in zip(responses, valid)
+            )
+        
+        results = [self.cached_response(response, limit=None) if ok else ([], None)
+                   for response, ok in zip(responses, valid)]
+        pending = [index for index, result in enumerate(results) if result is None]
+        pages = [(responses[index].content, responses[index].encoding) for index in pending]
+        for index, result in zip(pending, self.parse_pipeline.parse_many(product_name, pages)):
+            self.cache_response(responses[index], *result)
+            results[index] = result
+        return [documents for documents, _ in results]
+
+    def parse_search_page(self, product_name, html, limit=10, scraped_date=None):
+        """
+        Extrae los productos de una página de resultados con el parser configurado.
+        Retorna (documentos, total de resultados de la búsqueda o None).
+        limit=None procesa todos los productos de la página.
+        """
+        return extract_search_page(
+            product_name, html, limit, parser=self.parser, scraped_date=scraped_date, selectors=self.selectors
+        )
+
+    def replay_archive(self, since=None, until=None, latest_only=True):
+        """
+        Vuelve a extraer los productos de las páginas del archivo local, sin red, y
+        los agrega a self.data. Cada documento lleva la fecha de descarga de su página.
+        `since`/`until` acotan las fechas (ISO); latest_only=True usa solo la última
+        descarga de cada URL. Retorna la cantidad de productos extraídos.
+        """
+        archive = self.archive or PageArchive()
+        # De la más nueva a la más vieja: al deduplicar gana la versión más reciente
+        pages = archive.pages(since, until, latest_only)[::-1]
+        if not pages:
+            print("📭 No hay páginas en el archivo para ese rango de fechas")
+            return 0
+        
+        print(f"📼 Re-extrayendo {len(pages)} páginas archivadas...")
+        start = time.perf_counter()
+        documents = []
+        if self.parse_pipeline is not None:
+            futures = [
+                self.parse_pipeline.submit(
+                    page["product_name"] or "", archive.load(page["sha256"], page["compression"]),
+                    page["encoding"], limit=None, scraped_date=page["fetched_at"]
+                )
+                for page in pages
+            ]
+            for future in futures:
+                documents.extend(self.parse_pipeline.result(future)[0])
+        else:
+            for page in pages:
+                body = archive.load(page["sha256"], page["compression"])
+                html = body.decode(page["encoding"] or "utf-8", errors="replace")
+                page_documents, _ = self.parse_search_page(
+                    page["product_name"] or "", html, limit=None, scraped_date=page["fetched_at"]
+                )
+                documents.extend(page_documents)
+        elapsed = time.perf_counter() - start
+        
+        self.data.extend(documents)
+        self.deduplicate_data()
+        print(f"📼 {len(documents)} productos extraídos de {len(pages)} páginas en {elapsed:.2f} s "
+              f"({len(pages) / elapsed if elapsed else 0:.0f} páginas/s)")
+        return len(documents)
+
     def scraping(self):
         """Método para scraping manual"""
         product_name = input("\nProducto: ")
         self.scraping_single_model(product_name)
 
-    def save_to_mongodb(self):
-        """Guarda los datos scrapeados en MongoDB"""
+    def save_to_mongodb(self, record_prices=True):
+        """
+        Guarda los datos scrapeados en MongoDB.
+        record_prices=False no agrega observaciones al historial de precios (p. ej. al
+        guardar productos re-extraídos del archivo, ya observados en su momento).
+        """
         if not self.data:
             print("No hay datos para guardar en MongoDB.")
             return
         
         try:
-            result = self.collection.insert_many(self.data)
-            print(f"✅ {len(result.inserted_ids)} productos guardados en MongoDB")
+            result = upsert_listings(self.collection, self.data)
+            print(f"✅ Productos guardados en MongoDB: {result['inserted']} nuevos, "
+                  f"{result['updated']} actualizados, {result['unchanged']} sin cambios")
+            if result['stale']:
+                print(f"⏭️ {result['stale']} productos no se actualizaron: la base ya tiene una versión más reciente")
+            if result['skipped']:
+                print(f"⚠️ {result['skipped']} productos sin ID ni enlace no se guardaron")
             print(f"📁 Colección: {self.collection_name}")
             
+            # Todas las observaciones de precio van al historial, hayan cambiado o no
+            if record_prices:
+                observations = record_price_observations(self.price_history, self.data)
+                print(f"📈 {observations} observaciones de precio guardadas en el historial")
+            
+            if self.enrich_details:
+                self.enrich_listings(self.data)
+            
             # Limpiar datos locales después de guardar
             self.data = []
             
         except Exception as e:
             print(f"❌ Error guardando en MongoDB: {e}")
 
-    def export_to_csv(self):
-        """Exporta los datos a un archivo CSV (método de respaldo)"""
-        if not self.data:
-            print("No hay datos para exportar.")
+    def fetch_item_details(self, document):
+        """
+        Descarga la página de una publicación y extrae sus especificaciones (None si falla).
+        La URL se arma con el listing_id: el enlace de la tarjeta puede ser un clic de anuncio.
+        """
+        response = self.fetch_page(item_url(document["listing_id"]), search_page=False)
+        if response is None or response.status_code != 200:
+            return None
+        try:
+            return extract_item_details(response.text, document.get("title"), self.parser)
+        except Exception as e:
+            print(f"⚠️ Error extrayendo las especificaciones de {document['listing_id']}: {e}")
+            return None
+
+    def enrich_listings(self, documents):
+        """
+        Agrega a las publicaciones guardadas las especificaciones de su página.
+        Solo se descargan las publicaciones nuevas, cambiadas o con especificaciones
+        de más de details_max_age_days días, como mucho detail_concurrency a la vez.
+        Retorna la cantidad de publicaciones actualizadas.
+        """
+        pending = listings_to_enrich(self.listing_details, documents, self.details_max_age_days)
+        if not pending:
+            print("🔬 Especificaciones al día, no hay publicaciones que visitar")
+            return 0
+        
+        print(f"🔬 Descargando las especificaciones de {len(pending)} publicaciones nuevas o cambiadas...")
+        with ThreadPoolExecutor(max_workers=self.detail_concurrency) as executor:
+            details = list(executor.map(self.fetch_item_details, pending))
+        
+        enriched = [(doc, doc_details) for doc, doc_details in zip(pending, details) if doc_details is not None]
+        updated = save_listing_details(self.listing_details, self.collection, enriched)
+        failed = len(pending) - len(enriched)
+        print(f"🔬 {updated} publicaciones con especificaciones actualizadas"
+              + (f" ({failed} páginas no se pudieron leer)" if failed else ""))
+        return updated
+
+    def export_to_csv(self, filename="data/rtx_40_50_series_peru.csv", query=None):
+        """
+        Exporta la colección a CSV (o a Parquet si `filename` termina en .parquet).
+        Los documentos se leen de MongoDB y se escriben por partes.
+        """
+        def report_progress(written, total):
+            print(f"   📤 {written}/{total} productos exportados")
+        
+        try:
+            exported = export_collection(self.collection, filename, query, progress=report_progress)
+        except Exception as e:
+            print(f"❌ Error exportando datos: {e}")
             return
-            
-        os.makedirs("data", exist_ok=True)
         
-        df = pd.DataFrame(self.data)
-        filename = "data/rtx_40_50_series_peru.csv"
-        df.to_csv(filename, sep=";", index=False)
+        if exported == 0:
+            print("No hay datos para exportar.")
+            return
         print(f"Datos exportados a: {filename}")
-        print(f"Total de productos exportados: {len(self.data)}")
+        print(f"Total de productos exportados: {exported}")
     
+    def print_connection_stats(self):
+        """Muestra cuántas conexiones HTTP se abrieron y cuántas se reutilizaron"""
+        stats = self.session.connection_stats()
+        print(f"🔌 Peticiones HTTP: {stats['requests']} | "
+              f"Conexiones nuevas: {stats['new_connections']} | "
+              f"Reutilizadas: {stats['reused_connections']}")
+
+    def close(self):
+        """Cierra la sesión HTTP, el pool de parseo y guarda las estadísticas de selectores"""
+        self.page_executor.shutdown(wait=True)
+        self.session.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.parse_pipeline is not None:
+            self.parse_pipeline.close()
+            self.parse_pipeline = None
+        try:
+            self.selectors.save()
+        except OSError as e:
+            print(f"⚠️ No se pudieron guardar las estadísticas de selectores: {e}")
+
     def get_collection_stats(self):
         """Muestra estadísticas de la colección"""
         try:
@@ -254,15 +646,26 @@ class Scraper():
             print(f"❌ Error limpiando colección: {e}")
 
 if __name__ == "__main__":
-    s = Scraper()
+    # Guardar las páginas descargadas en data/page_archive (para re-extraerlas con la opción 8)
+    ARCHIVE_PAGES = False
+    # Peticiones condicionales y caché de documentos en data/http_cache.sqlite
+    HTTP_CACHE = True
+    # Visitar la página de las publicaciones nuevas o cambiadas para agregar VRAM, marca, vendedor...
+    ENRICH_DETAILS = False
+    
+    s = Scraper(archive_pages=ARCHIVE_PAGES, http_cache=HTTP_CACHE, enrich_details=ENRICH_DETAILS)
     
     print("\n=== Scraper de Gráficas RTX Serie 40 y 50 - Perú ===")
     print("1. Scrapear todas las gráficas RTX serie 40 y 50 automáticamente")
     print("2. Scrapear un producto específico")
     print("3. Ver estadísticas de la base de datos")
     print("4. Limpiar toda la colección (⚠️ CUIDADO)")
+    print("5. Scrapear todas las gráficas RTX en modo asíncrono (búsquedas simultáneas)")
+    print("6. Scrapear todas las gráficas RTX recorriendo todas las páginas de resultados")
+    print("7. Exportar la colección a CSV o Parquet")
+    print("8. Re-extraer los productos de las páginas archivadas (sin red)")
     
-    opcion = input("\nSelecciona una opción (1-4): ").strip()
+    opcion = input("\nSelecciona una opción (1-8): ").strip()
     
     if opcion == "1":
         s.scrape_all_rtx_models()
@@ -280,11 +683,31 @@ if __name__ == "__main__":
             s.clear_collection()
         else:
             print("Operación cancelada.")
+    elif opcion == "5":
+        s.scrape_all_rtx_models(async_mode=True)
+        s.save_to_mongodb()
+        s.get_collection_stats()
+    elif opcion == "6":
+        s.start_parse_pool()
+        s.scrape_all_rtx_models(async_mode=True, paginate=True)
+        s.save_to_mongodb()
+        s.get_collection_stats()
+    elif opcion == "7":
+        formato = input("Formato (csv/parquet): ").strip().lower()
+        extension = "parquet" if formato == "parquet" else "csv"
+        s.export_to_csv(f"data/rtx_40_50_series_peru.{extension}")
+    elif opcion == "8":
+        desde = input("Desde la fecha (AAAA-MM-DD, vacío = todas): ").strip() or None
+        if s.replay_archive(since=desde):
+            guardar = input("¿Guardar los productos re-extraídos en MongoDB? (si/no): ").lower()
+            if guardar == "si":
+                s.save_to_mongodb(record_prices=False)
     else:
         print("Opción no válida. Scrapeando todas las gráficas RTX por defecto...")
         s.scrape_all_rtx_models()
         s.save_to_mongodb()
         s.get_collection_stats()
     
+    s.close()
     close_mongodb_connection()
     print("👋 Scraper finalizado.")
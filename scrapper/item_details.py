@@ -0,0 +1,156 @@
+# scrapper/item_details.py
+
+"""
+Extracción de las especificaciones de la página de una publicación.
+La tarjeta de la búsqueda solo trae título, precio, enlace e imagen; la página de
+la publicación agrega VRAM, marca, vendedor, stock y condición. Se leen primero
+del JSON-LD de la página (schema.org Product) y de la tabla de especificaciones,
+y como último recurso del título.
+"""
+
+import json
+import os
+import re
+import sys
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper.html_parsers import HTMLParser
+
+# Página de una publicación a partir de su ID (sin pasar por enlaces de anuncios)
+ITEM_URL = "https://articulo.mercadolibre.com.pe/MLP-{}"
+
+# Campos que se agregan al documento de la publicación
+DETAIL_FIELDS = ("vram_gb", "brand", "seller", "stock", "condition")
+
+DETAIL_SELECTORS = {
+    "spec_row": ['tr.andes-table__row', '.ui-vpp-striped-specs__table tr'],
+    "seller": ['.ui-pdp-seller__link-trigger', '.ui-pdp-seller__header__title', '[class*="seller__label-sold"] a'],
+    "stock": ['.ui-pdp-buybox__quantity__available', '.ui-pdp-buybox__quantity__selected'],
+    "subtitle": ['.ui-pdp-header__subtitle', '.ui-pdp-subtitle'],
+}
+
+# Etiquetas de la tabla de especificaciones -> campo
+SPEC_LABELS = {
+    "marca": "brand",
+    "memoria de video": "vram_gb",
+    "capacidad de memoria": "vram_gb",
+    "tamaño de la memoria": "vram_gb",
+    "condición del ítem": "condition",
+}
+
+CONDITIONS = {"new": "Nuevo", "used": "Usado", "refurbished": "Reacondicionado"}
+
+_JSON_LD = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.DOTALL | re.IGNORECASE)
+_GB = re.compile(r'(\d{1,2})\s*GB\b', re.IGNORECASE)
+
+
+def _first(node, selectors):
+    """Primer elemento que encuentra alguno de los selectores (None si ninguno)"""
+    for css in selectors:
+        element = node.select_one(css)
+        if element:
+            return element
+    return None
+
+
+def _spec_rows(root):
+    """Filas de la tabla de especificaciones (lista vacía si la página no la tiene)"""
+    for css in DETAIL_SELECTORS["spec_row"]:
+        rows = root.select(css)
+        if rows:
+            return rows
+    return []
+
+
+def item_url(listing_id):
+    """URL de la página de una publicación ('MLP123456789' -> .../MLP-123456789)"""
+    return ITEM_URL.format(listing_id[3:])
+
+
+def parse_vram(text):
+    """Gigabytes de memoria de video en un texto ('12 GB', 'RTX 4070 12GB'); None si no aparece"""
+    match = _GB.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+def parse_condition(text):
+    """Condición normalizada ('Nuevo', 'Usado', 'Reacondicionado') desde texto o schema.org"""
+    text = (text or "").lower()
+    for key, condition in CONDITIONS.items():
+        if key in text or condition.lower() in text:
+            return condition
+    return None
+
+
+def parse_stock(text):
+    """Unidades disponibles ('(15 disponibles)', 'Último disponible'); None si no aparece"""
+    text = (text or "").lower()
+    digits = re.search(r'\d+', text.replace(".", ""))
+    if digits:
+        return int(digits.group())
+    if "último" in text or "ultimo" in text:
+        return 1
+    return None
+
+
+def json_ld_product(html):
+    """Objeto schema.org Product del JSON-LD de la página ({} si no hay)"""
+    for match in _JSON_LD.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for item in data if isinstance(data, list) else data.get("@graph", [data]):
+            if isinstance(item, dict) and item.get("@type") == "Product":
+                return item
+    return {}
+
+
+def extract_item_details(html, title=None, parser=None):
+    """
+    Especificaciones de la página de una publicación: diccionario con DETAIL_FIELDS
+    (None en los que no se encuentran).
+    """
+    details = dict.fromkeys(DETAIL_FIELDS)
+
+    product = json_ld_product(html)
+    if product:
+        brand = product.get("brand")
+        details["brand"] = brand.get("name") if isinstance(brand, dict) else brand
+        offers = product.get("offers") or {}
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        details["condition"] = parse_condition(offers.get("itemCondition") or product.get("itemCondition"))
+        seller = offers.get("seller") or {}
+        details["seller"] = seller.get("name") if isinstance(seller, dict) else None
+        if "OutOfStock" in str(offers.get("availability", "")):
+            details["stock"] = 0
+
+    root = (parser or HTMLParser()).parse(html)
+
+    for row in _spec_rows(root):
+        header = row.select_one("th")
+        value = row.select_one("td")
+        if not header or not value:
+            continue
+        field = SPEC_LABELS.get(header.text().strip().lower())
+        if field == "vram_gb":
+            details["vram_gb"] = details["vram_gb"] or parse_vram(value.text())
+        elif field and not details[field]:
+            details[field] = value.text().strip() if field == "brand" else parse_condition(value.text())
+
+    if not details["seller"]:
+        seller = _first(root, DETAIL_SELECTORS["seller"])
+        details["seller"] = seller.text().strip() if seller else None
+    if details["stock"] is None:
+        stock = _first(root, DETAIL_SELECTORS["stock"])
+        details["stock"] = parse_stock(stock.text()) if stock else None
+    if not details["condition"]:
+        # 'Nuevo | +100 vendidos'
+        subtitle = _first(root, DETAIL_SELECTORS["subtitle"])
+        details["condition"] = parse_condition(subtitle.text()) if subtitle else None
+    if details["vram_gb"] is None:
+        details["vram_gb"] = parse_vram(title)
+
+    return details
@@ -0,0 +1,176 @@
+# scrapper/listing_extractor.py
+
+"""
+Extracción de publicaciones de una página de resultados de MercadoLibre.
+Es una función independiente del Scraper (no usa red ni MongoDB), así se puede
+correr sobre páginas guardadas o en otros procesos con cualquier backend de
+scrapper/html_parsers.py.
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper.embedded_state import extract_state_listings
+from scrapper.html_parsers import HTMLParser
+from scrapper.listing_id import extract_listing_id
+from scrapper.selector_registry import SelectorRegistry
+
+# Selectores alternativos de cada campo de una tarjeta de resultado
+SEARCH_SELECTORS = {
+    "item": ['li.ui-search-layout__item', '.ui-search-result'],
+    "title": ['.poly-component__title a', 'h2 a', '.ui-search-item__title', 'a[class*="title"]'],
+    "price": ['.andes-money-amount__fraction', '.price-tag-fraction', '[class*="price"][class*="fraction"]'],
+    "link": ['.poly-component__title a', 'h2 a', 'a'],
+    "image": ['.poly-component__picture', 'img'],
+}
+# Cadenas que no se reordenan por tasa de aciertos (solo se relegan los selectores muertos):
+# la lista de tarjetas se busca una vez por página y sus selectores no compiten
+KEEP_ORDER = ("item",)
+# Selectores genéricos que van siempre al final de su cadena: aciertan en casi todas
+# las tarjetas, pero cuando falta el específico pueden tomar otro elemento (el primer 'a')
+FALLBACKS = {
+    "title": ['a[class*="title"]'],
+    "link": ['a'],
+    "image": ['img'],
+}
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+def detect_series(product_name):
+    """Serie de la gráfica según el modelo buscado"""
+    if any(x in product_name for x in ["40", "4060", "4070", "4080", "4090"]):
+        return "RTX 40"
+    if any(x in product_name for x in ["50", "5060", "5070", "5080", "5090"]):
+        return "RTX 50"
+    return "RTX"
+
+
+def parse_price(price):
+    """Convierte el texto del precio ('2.499', 'S/ 2,499') a número (0 si no se puede)"""
+    price_clean = price.replace(",", "").replace(".", "").replace("S/", "").strip()
+    try:
+        return float(price_clean)
+    except ValueError:
+        return 0
+
+
+def parse_total_results(root):
+    """Lee el total de resultados de la búsqueda ('1.234 resultados'); None si no aparece"""
+    element = root.select_one('.ui-search-search-result__quantity-results')
+    if not element:
+        return None
+    digits = re.sub(r"\D", "", element.text())
+    return int(digits) if digits else None
+
+
+def search_selector_registry(path=None):
+    """Registro de selectores de la página de resultados (con estadísticas guardadas en `path`)"""
+    return SelectorRegistry(SEARCH_SELECTORS, path=path, keep_order=KEEP_ORDER, fallbacks=FALLBACKS)
+
+
+def extract_search_page(product_name, html, limit=10, parser=None, scraped_date=None, verbose=True,
+                        use_state=True, selectors=None):
+    """
+    Extrae los productos de una página de resultados.
+    Retorna (documentos, total de resultados de la búsqueda o None).
+    limit=None procesa todos los productos de la página. `scraped_date` fija la
+    fecha de los documentos (por defecto, la hora actual).
+    Con use_state=True se usa el estado JSON incrustado en la página y los
+    selectores CSS solo si la página no lo trae. `selectors` es el registro de
+    selectores (SelectorRegistry) que se usa y actualiza con los aciertos.
+    """
+    log = print if verbose else _quiet
+    series = detect_series(product_name)
+
+    if use_state:
+        extracted = extract_state_listings(product_name, html, series, limit, scraped_date)
+        if extracted is not None:
+            log(f"📦 Productos encontrados (estado JSON): {len(extracted[0])}")
+            return extracted
+
+    parser = parser or HTMLParser()
+    selectors = selectors or search_selector_registry()
+    documents = []
+
+    root = parser.parse(html)
+    total_results = parse_total_results(root)
+
+    # Buscar elementos de producto con diferentes selectores
+    content = selectors.select(root, "item")
+
+    if not content:
+        log(f"❌ No se encontraron productos para {product_name}")
+        return documents, total_results
+
+    log(f"📦 Productos encontrados: {len(content)}")
+
+    # Procesar máximo `limit` productos por modelo
+    for i, post in enumerate(content[:limit]):
+        try:
+            # Buscar título
+            title_element = selectors.select_one(post, "title")
+            if title_element:
+                title = title_element.text()
+                log(f"   📝 Título: {title[:50]}...")
+            else:
+                log("   ❌ No se encontró título")
+                continue
+
+            # Buscar precio
+            price_element = selectors.select_one(post, "price")
+            if price_element:
+                price = price_element.text()
+                log(f"   💰 Precio: {price}")
+            else:
+                log("   ❌ No se encontró precio")
+                continue
+
+            # Buscar enlace
+            link_element = selectors.select_one(post, "link")
+
+            post_link = ""
+            if link_element and link_element.attr("href"):
+                post_link = link_element.attr("href")
+                if not post_link.startswith('http'):
+                    post_link = f"https://mercadolibre.com.pe{post_link}"
+                log(f"   🔗 Enlace encontrado")
+
+            # Buscar imagen
+            img_element = selectors.select_one(post, "image")
+
+            img_link = ""
+            if img_element:
+                img_link = img_element.attr("data-src") or img_element.attr("src")
+                log(f"   🖼️ Imagen encontrada")
+
+            # Crear documento
+            post_data = {
+                "listing_id": extract_listing_id(post_link),
+                "model_searched": product_name,
+                "title": title,
+                "price_text": price,
+                "price_numeric": parse_price(price),
+                "series": series,
+                "post_link": post_link,
+                "image_link": img_link,
+                "scraped_date": scraped_date or datetime.now().isoformat(),
+                "country": "Peru",
+                "source": "MercadoLibre"
+            }
+
+            documents.append(post_data)
+
+            log(f"   ✅ Producto {len(documents)}: {title[:50]}... - {price}")
+
+        except Exception as e:
+            log(f"   ❌ Error procesando producto {i+1}: {e}")
+            continue
+
+    return documents, total_results
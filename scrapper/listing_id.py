@@ -0,0 +1,54 @@
+# scrapper/listing_id.py
+
+"""
+Identificadores de publicaciones de MercadoLibre.
+Cada publicación tiene un ID estable (p. ej. 'MLP123456789') que aparece en su enlace.
+"""
+
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+# ID de publicación en la ruta: .../MLP-123456789-titulo-_JM
+_ITEM_ID_PATTERN = re.compile(r"\b(MLP)-?(\d{6,})", re.IGNORECASE)
+# ID de publicación en enlaces de catálogo: .../p/MLP2416...#...&wid=MLP451234567
+_WID_PATTERN = re.compile(r"[#&?]wid=(MLP)-?(\d{6,})", re.IGNORECASE)
+# Enlace de catálogo: .../p/MLP24161234 (ID del producto, compartido por varios vendedores)
+_CATALOG_PATTERN = re.compile(r"/p/MLP-?\d+", re.IGNORECASE)
+
+
+def extract_listing_id(url):
+    """
+    Extrae el ID de la publicación desde su enlace.
+    Retorna el ID normalizado ('MLP' + dígitos) o None si el enlace no contiene uno.
+    """
+    if not url:
+        return None
+
+    # Los enlaces de catálogo (/p/MLP...) apuntan al producto, no a la publicación;
+    # la publicación concreta viene en el parámetro 'wid'
+    match = _WID_PATTERN.search(url)
+    if not match:
+        # Sin 'wid', un enlace de catálogo no identifica a la publicación
+        if _CATALOG_PATTERN.search(url):
+            return None
+        match = _ITEM_ID_PATTERN.search(url)
+    if not match:
+        return None
+    return f"{match.group(1).upper()}{match.group(2)}"
+
+
+def canonical_link(url):
+    """Enlace sin parámetros ni fragmento (los de seguimiento cambian entre ejecuciones)"""
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+def listing_key(document):
+    """Clave para deduplicar documentos: el ID de la publicación o, si no hay, su enlace canónico"""
+    return (
+        document.get("listing_id")
+        or extract_listing_id(document.get("post_link"))
+        or canonical_link(document.get("post_link"))
+    )
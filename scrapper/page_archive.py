@@ -0,0 +1,155 @@
+# scrapper/page_archive.py
+
+"""
+Archivo local de las páginas descargadas por el scraper.
+Cada página se guarda comprimida (zstd si está instalado, gzip si no) con el hash
+SHA-256 de su contenido como nombre, así una página idéntica se guarda una sola vez.
+Un índice SQLite registra cada descarga (URL, fecha, búsqueda, hash) para volver a
+extraer los documentos sin red: backfills y benchmarks de parsers reproducibles.
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "page_archive")
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_EXTENSIONS = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+def compress(body, compression):
+    """Comprime el contenido con el método indicado ('zstd' o 'gzip')"""
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(body)
+    return gzip.compress(body, compresslevel=6)
+
+
+def decompress(data, compression):
+    """Descomprime el contenido guardado con el método indicado"""
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("La página está comprimida con zstd: instala zstandard (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """
+    Archivo de páginas direccionado por contenido con índice por URL y fecha.
+    Se puede usar desde varios hilos a la vez.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, compression=None):
+        self.root = root
+        self.compression = compression or ("zstd" if zstandard is not None else "gzip")
+        if self.compression == "zstd" and zstandard is None:
+            print("⚠️ zstandard no está instalado, el archivo de páginas usa gzip")
+            self.compression = "gzip"
+
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                product_name TEXT,
+                sha256 TEXT NOT NULL,
+                compression TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                encoding TEXT
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_url_date ON pages (url, fetched_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_date ON pages (fetched_at)")
+        self._db.commit()
+
+    def object_path(self, sha256, compression):
+        """Ruta del archivo comprimido de un contenido (subcarpeta por los 2 primeros caracteres)"""
+        return os.path.join(self.root, "objects", sha256[:2], sha256 + _EXTENSIONS[compression])
+
+    def store(self, url, body, product_name=None, encoding=None, fetched_at=None):
+        """Guarda una página descargada. Retorna el hash de su contenido"""
+        sha256 = hashlib.sha256(body).hexdigest()
+        fetched_at = fetched_at or datetime.now().isoformat()
+
+        # Un contenido ya guardado (con cualquier compresión) no se vuelve a escribir
+        compression = self.compression
+        for existing in _EXTENSIONS:
+            if os.path.exists(self.object_path(sha256, existing)):
+                compression = existing
+                break
+        else:
+            path = self.object_path(sha256, compression)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(compress(body, compression))
+            os.replace(temp_path, path)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO pages (url, fetched_at, product_name, sha256, compression, size, encoding) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, fetched_at, product_name, sha256, compression, len(body), encoding)
+            )
+            self._db.commit()
+        return sha256
+
+    def load(self, sha256, compression):
+        """Contenido (bytes) de una página guardada"""
+        with open(self.object_path(sha256, compression), "rb") as f:
+            return decompress(f.read(), compression)
+
+    def pages(self, since=None, until=None, latest_only=True):
+        """
+        Descargas registradas entre `since` y `until` (fechas ISO), de la más vieja a la
+        más nueva, como diccionarios. Con latest_only=True solo la última de cada URL.
+        """
+        conditions, params = [], []
+        if since:
+            conditions.append("fetched_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("fetched_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        if latest_only:
+            query = f"""
+                SELECT * FROM pages WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY url ORDER BY fetched_at DESC, id DESC) AS position
+                        FROM pages {where}
+                    ) WHERE position = 1
+                ) ORDER BY fetched_at, id
+            """
+        else:
+            query = f"SELECT * FROM pages {where} ORDER BY fetched_at, id"
+
+        with self._lock:
+            cursor = self._db.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def summary(self):
+        """Cantidad de descargas, contenidos distintos y bytes sin comprimir registrados"""
+        with self._lock:
+            downloads, distinct, size = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT sha256), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {"downloads": downloads, "distinct_pages": distinct, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
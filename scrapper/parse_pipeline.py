@@ -0,0 +1,119 @@
+# scrapper/parse_pipeline.py
+
+"""
+Etapa de parseo en procesos separados.
+Los hilos que descargan páginas entregan el HTML crudo (bytes) a un pool de procesos
+que extrae los documentos; así el parseo no compite por el GIL con las descargas y
+escala con la cantidad de núcleos. La cantidad de páginas en espera de parseo está
+acotada: si los procesos no dan abasto, quien entrega una página espera (backpressure)
+en lugar de acumular HTML en memoria.
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Agregar el directorio padre al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapper.html_parsers import HTMLParser
+from scrapper.listing_extractor import extract_search_page, search_selector_registry
+
+# Estado de cada proceso de parseo (se crea una vez por proceso)
+_worker_parser = None
+_worker_selectors = None
+
+
+def _init_worker(parser_backend, selector_stats):
+    """Inicializa el parser y el registro de selectores del proceso"""
+    global _worker_parser, _worker_selectors
+    _worker_parser = HTMLParser(parser_backend)
+    _worker_selectors = search_selector_registry()
+    if selector_stats:
+        # Mismo orden de selectores que el registro del proceso principal
+        _worker_selectors.merge(selector_stats)
+
+
+def _parse_page(product_name, body, encoding, limit, verbose, scraped_date=None):
+    """
+    Extrae los documentos de una página dentro de un proceso del pool.
+    Retorna (documentos, total de resultados, estadísticas de selectores de esta página).
+    """
+    html = body.decode(encoding or "utf-8", errors="replace") if isinstance(body, bytes) else body
+    before = _worker_selectors.snapshot()
+    documents, total_results = extract_search_page(
+        product_name, html, limit, parser=_worker_parser, scraped_date=scraped_date,
+        verbose=verbose, selectors=_worker_selectors
+    )
+    return documents, total_results, _worker_selectors.delta_since(before)
+
+
+class ParsePipeline:
+    """
+    Pool de procesos que parsea páginas de resultados.
+    submit() entrega una página y result() espera sus documentos; como mucho
+    `max_pending` páginas esperan o están en parseo a la vez.
+    """
+
+    def __init__(self, workers=None, max_pending=None, parser_backend=None, selectors=None, verbose=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self.selectors = selectors  # Registro principal: recibe las estadísticas de los procesos
+        self.verbose = verbose
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(parser_backend, selectors.snapshot() if selectors else None)
+        )
+        self.pages_parsed = 0
+
+    def submit(self, product_name, body, encoding=None, limit=10, scraped_date=None):
+        """
+        Entrega una página (bytes o texto) al pool. Bloquea mientras haya max_pending
+        páginas sin terminar. Retorna un Future para result().
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(
+                _parse_page, product_name, body, encoding, limit, self.verbose, scraped_date
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._page_done)
+        return future
+
+    def _page_done(self, future):
+        self._slots.release()
+        self.pages_parsed += 1
+
+    def result(self, future):
+        """Espera una página entregada con submit(). Retorna (documentos, total de resultados)"""
+        documents, total_results, selector_stats = future.result()
+        if self.selectors is not None:
+            self.selectors.merge(selector_stats)
+        return documents, total_results
+
+    def parse(self, product_name, body, encoding=None, limit=10):
+        """Parsea una página en el pool y espera el resultado: (documentos, total)"""
+        return self.result(self.submit(product_name, body, encoding, limit))
+
+    def parse_many(self, product_name, pages, limit=None):
+        """
+        Parsea varias páginas [(bytes, encoding)] en paralelo. Retorna sus resultados
+        (documentos, total) en el mismo orden; una página que falla da ([], None).
+        """
+        futures = [self.submit(product_name, body, encoding, limit) for body, encoding in pages]
+        results = []
+        for future in futures:
+            try:
+                results.append(self.result(future))
+            except Exception as e:
+                print(f"❌ Error parseando una página de {product_name}: {e}")
+                results.append(([], None))
+        return results
+
+    def close(self):
+        """Espera las páginas pendientes y detiene los procesos"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,139 @@
+# scrapper/query_planner.py
+
+"""
+Planificador de búsquedas del scraper.
+Mide, con los resultados de las últimas ejecuciones, cuánto se solapan las
+publicaciones que devuelve cada búsqueda (por ID de publicación) y descarta las
+búsquedas redundantes, p. ej. "GeForce RTX 4090" cuando "RTX 4090" ya trae casi
+las mismas publicaciones.
+"""
+
+from datetime import datetime
+
+
+class QueryPlan:
+    """Resultado de la planificación: búsquedas a ejecutar y búsquedas fusionadas"""
+
+    def __init__(self, queries, merged=None, probe=False):
+        # Búsquedas que se ejecutarán, en el orden original
+        self.queries = queries
+        # Búsquedas descartadas -> búsqueda que las cubre
+        self.merged = merged or {}
+        # True si es una ejecución completa para refrescar las estadísticas
+        self.probe = probe
+
+    @property
+    def saved_requests(self):
+        """Peticiones de búsqueda que se ahorran en esta ejecución"""
+        return len(self.merged)
+
+    def print_summary(self):
+        """Muestra el plan de búsquedas por consola"""
+        if self.probe:
+            print(f"🧭 Plan de búsquedas: ejecución completa ({len(self.queries)} búsquedas) para medir solapamientos")
+            return
+        print(f"🧭 Plan de búsquedas: {len(self.queries)} búsquedas, "
+              f"{self.saved_requests} peticiones ahorradas")
+        for dropped, kept in self.merged.items():
+            print(f"   • '{dropped}' fusionada en '{kept}'")
+
+
+class QueryPlanner:
+    """
+    Decide qué búsquedas ejecutar a partir del historial guardado en MongoDB.
+
+    - overlap_threshold: fracción mínima de publicaciones de una búsqueda que otra
+      debe cubrir para considerarla redundante
+    - history_runs: cantidad de ejecuciones recientes que se usan para medir
+    - probe_every: cada cuántas ejecuciones se corren todas las búsquedas para
+      actualizar las mediciones (las búsquedas descartadas no generan historial)
+    """
+
+    def __init__(self, history_collection, overlap_threshold=0.9, history_runs=5, probe_every=5):
+        self.history_collection = history_collection
+        self.overlap_threshold = overlap_threshold
+        self.history_runs = history_runs
+        self.probe_every = probe_every
+
+    def load_recent_runs(self, limit):
+        """Retorna las últimas ejecuciones (más reciente primero) tal como se guardaron"""
+        cursor = self.history_collection.find({}, {"results": 1, "probe": 1}).sort("run_date", -1).limit(limit)
+        return list(cursor)
+
+    def needs_probe(self, recent_runs):
+        """True si ninguna de las últimas probe_every - 1 ejecuciones fue completa"""
+        if not recent_runs:
+            return True
+        return not any(run.get("probe") for run in recent_runs[:self.probe_every - 1])
+
+    def coverage(self, runs, query, other):
+        """
+        Fracción promedio de las publicaciones de `query` que también devolvió `other`.
+        Solo cuenta las ejecuciones en las que ambas búsquedas tuvieron resultados.
+        """
+        ratios = []
+        for run in runs:
+            ids = run.get(query)
+            other_ids = run.get(other)
+            if ids and other_ids:
+                ratios.append(len(ids & other_ids) / len(ids))
+        if not ratios:
+            return 0.0
+        return sum(ratios) / len(ratios)
+
+    def plan(self, queries):
+        """Construye el plan de búsquedas para esta ejecución"""
+        try:
+            recent_runs = self.load_recent_runs(max(self.history_runs, self.probe_every))
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el historial de búsquedas: {e}")
+            return QueryPlan(list(queries), probe=True)
+
+        if self.needs_probe(recent_runs):
+            return QueryPlan(list(queries), probe=True)
+
+        runs = [
+            {entry["query"]: set(entry["listing_ids"]) for entry in run.get("results", [])}
+            for run in recent_runs[:self.history_runs]
+        ]
+
+        # Las búsquedas con más resultados se consideran primero: son las que
+        # suelen cubrir a las variantes más específicas
+        def average_size(query):
+            sizes = [len(run[query]) for run in runs if query in run]
+            return sum(sizes) / len(sizes) if sizes else 0
+
+        kept = []
+        merged = {}
+        for query in sorted(queries, key=average_size, reverse=True):
+            covering = next(
+                (k for k in kept if self.coverage(runs, query, k) >= self.overlap_threshold),
+                None
+            )
+            if covering is not None:
+                merged[query] = covering
+            else:
+                kept.append(query)
+
+        return QueryPlan([q for q in queries if q not in merged], merged)
+
+    def record_run(self, plan, results_by_query, max_stored_runs=50):
+        """Guarda los IDs de publicación que devolvió cada búsqueda en esta ejecución"""
+        try:
+            self.history_collection.insert_one({
+                "run_date": datetime.now().isoformat(),
+                "probe": plan.probe,
+                "saved_requests": plan.saved_requests,
+                "results": [
+                    {"query": query, "listing_ids": sorted(ids)}
+                    for query, ids in results_by_query.items()
+                ]
+            })
+
+            # Conservar solo las ejecuciones más recientes
+            old_runs = self.history_collection.find({}, {"_id": 1}).sort("run_date", -1).skip(max_stored_runs)
+            old_ids = [run["_id"] for run in old_runs]
+            if old_ids:
+                self.history_collection.delete_many({"_id": {"$in": old_ids}})
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar el historial de búsquedas: {e}")
@@ -0,0 +1,140 @@
+# scrapper/rate_limiter.py
+
+"""
+Control de ritmo de las peticiones del scraper.
+Cada host tiene un token bucket: las peticiones consumen un token y los tokens se
+reponen a `rate` por segundo. La tasa se ajusta con AIMD: sube de a poco con cada
+respuesta correcta y se reduce a la mitad ante un 429/5xx, así el scraper se acerca
+al máximo que tolera el servidor sin quedar bloqueado. Los reintentos esperan con
+backoff exponencial con jitter (y respetan Retry-After si el servidor lo envía).
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Respuestas que indican sobrecarga o bloqueo temporal: se reintentan y bajan la tasa
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """Espera antes del reintento `attempt` (0, 1, ...): exponencial con jitter completo"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """Segundos a esperar según la cabecera Retry-After (segundos o fecha HTTP); None si no hay"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class HostRateLimiter:
+    """
+    Token bucket por host con tasa adaptativa (AIMD). Se puede usar desde varios hilos.
+
+    - rate: peticiones por segundo iniciales de cada host
+    - min_rate / max_rate: límites de la tasa
+    - burst: tokens acumulables (peticiones seguidas tras un rato sin actividad)
+    - increase: peticiones/s que se suman por cada respuesta correcta
+    - decrease: factor por el que se multiplica la tasa ante un 429/5xx
+    """
+
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=10.0, burst=2, increase=0.1, decrease=0.5):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            now = time.monotonic()
+            state = {
+                "rate": self.initial_rate,
+                "tokens": float(self.burst),
+                "updated": now,
+                "blocked_until": now,
+                "last_decrease": None,
+                "requests": 0,
+                "throttled": 0,
+                "waited": 0.0,
+            }
+            self._hosts[host] = state
+        return state
+
+    def _refill(self, state, now):
+        state["tokens"] = min(state["tokens"] + (now - state["updated"]) * state["rate"], float(self.burst))
+        state["updated"] = now
+
+    def acquire(self, host):
+        """Espera hasta que haya un token para `host` y lo consume. Retorna los segundos esperados"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                state = self._host(host)
+                now = time.monotonic()
+                self._refill(state, now)
+                if now >= state["blocked_until"] and state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    state["requests"] += 1
+                    state["waited"] += waited
+                    return waited
+                delay = max(state["blocked_until"] - now, (1 - state["tokens"]) / state["rate"])
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self, host):
+        """Respuesta correcta: aumento aditivo de la tasa"""
+        with self._lock:
+            state = self._host(host)
+            state["rate"] = min(state["rate"] + self.increase, self.max_rate)
+
+    def on_throttle(self, host, retry_after=None):
+        """
+        Respuesta 429/5xx o error de conexión: reducción multiplicativa de la tasa y
+        pausa del host durante `retry_after` segundos si el servidor lo indicó.
+        Varias respuestas de la misma ráfaga cuentan como una sola reducción.
+        """
+        with self._lock:
+            state = self._host(host)
+            now = time.monotonic()
+            state["throttled"] += 1
+            last = state["last_decrease"]
+            if last is None or now - last >= 1 / state["rate"]:
+                state["rate"] = max(state["rate"] * self.decrease, self.min_rate)
+                state["last_decrease"] = now
+            state["tokens"] = 0.0
+            state["updated"] = now
+            if retry_after:
+                state["blocked_until"] = max(state["blocked_until"], now + retry_after)
+
+    def rate(self, host):
+        """Tasa actual (peticiones/s) de un host"""
+        with self._lock:
+            return self._host(host)["rate"]
+
+    def print_summary(self):
+        """Muestra por host la tasa alcanzada, las respuestas de sobrecarga y el tiempo de espera"""
+        with self._lock:
+            hosts = {host: dict(state) for host, state in self._hosts.items()}
+        for host, state in hosts.items():
+            print(f"🚦 {host}: {state['rate']:.2f} peticiones/s | "
+                  f"{state['requests']} peticiones, {state['throttled']} con 429/5xx o error | "
+                  f"{state['waited']:.1f} s de espera")
@@ -0,0 +1,267 @@
+# scrapper/selector_registry.py
+
+"""
+Registro de selectores CSS con estadísticas de aciertos.
+Cada campo (título, precio, enlace...) tiene una cadena de selectores alternativos.
+El registro cuenta cuántas veces se probó y acertó cada selector, prueba primero los
+que más aciertan y deja al final los que nunca aciertan. Las estadísticas se guardan
+entre ejecuciones: un cambio de diseño de la página se ve como una caída en la tasa
+de aciertos del campo en lugar de una extracción más lenta sin aviso.
+
+En el uso normal un selector solo se prueba si fallaron los anteriores, así que su
+tasa de aciertos depende de su posición. Para ordenar se usa otra tasa: cada
+`sample_every` búsquedas se prueba la cadena completa y se cuenta qué selectores
+habrían acertado (muestra sin condición, comparable entre selectores).
+"""
+
+import json
+import os
+import threading
+
+# Contadores por selector: intentos y aciertos en la cadena, y en las muestras de la cadena completa
+_COUNTERS = ("attempts", "hits", "probes", "probe_hits")
+
+STATS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "selector_stats.json")
+
+
+class SelectorRegistry:
+    """
+    Cadenas de selectores por campo con orden adaptativo.
+    `keep_order`: campos cuya cadena no se reordena por tasa de aciertos; en ellos
+    solo se relegan los muertos.
+    `fallbacks`: {campo: selectores} genéricos (como 'a') que siempre van después de
+    los específicos, aunque acierten más: pueden tomar otro elemento de la tarjeta.
+    """
+
+    def __init__(self, chains, path=None, min_attempts=30, decay=0.5, keep_order=(), fallbacks=None,
+                 sample_every=20):
+        self.chains = {field: list(selectors) for field, selectors in chains.items()}
+        self.path = path
+        self.min_attempts = min_attempts  # Intentos sin aciertos para considerar muerto un selector
+        self.decay = decay  # Peso de las ejecuciones anteriores al cargar las estadísticas
+        self.keep_order = set(keep_order)
+        self.fallbacks = {field: set(selectors) for field, selectors in (fallbacks or {}).items()}
+        self.sample_every = sample_every  # Cada cuántas búsquedas se prueba la cadena completa
+        self.history = {}  # Tasa de aciertos por campo en ejecuciones anteriores
+        self.stats = {field: self._empty_field(selectors) for field, selectors in self.chains.items()}
+        self._orders = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    @staticmethod
+    def _empty_field(selectors):
+        return {
+            "lookups": 0,
+            "hits": 0,
+            "selectors": {css: dict.fromkeys(_COUNTERS, 0) for css in selectors},
+        }
+
+    def load(self):
+        """Carga las estadísticas guardadas, con menos peso que las de esta ejecución"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.history = {
+            field: rate for field, rate in saved.get("history", {}).items() if field in self.stats
+        }
+        for field, saved_field in saved.get("fields", {}).items():
+            if field not in self.stats:
+                continue
+            for css, counts in saved_field.get("selectors", {}).items():
+                if css in self.stats[field]["selectors"]:
+                    self.stats[field]["selectors"][css] = {
+                        counter: counts.get(counter, 0) * self.decay for counter in _COUNTERS
+                    }
+
+    def save(self):
+        """Guarda las estadísticas y la tasa de aciertos de cada campo en esta ejecución"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            # Campos sin búsquedas en esta ejecución: se conserva la tasa anterior
+            history = dict(self.history)
+            for field in self.stats:
+                rate = self.hit_rate(field)
+                if rate is not None:
+                    history[field] = rate
+            data = {"history": history, "fields": self.stats}
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def is_dead(self, field, css):
+        """Selector probado (en la cadena o en las muestras) al menos min_attempts veces sin ningún acierto"""
+        counts = self.stats[field]["selectors"][css]
+        tries = counts["attempts"] + counts["probes"]
+        return tries >= self.min_attempts and counts["hits"] + counts["probe_hits"] == 0
+
+    def hit_rate(self, field, css=None):
+        """
+        Tasa de aciertos de un selector cuando se lo prueba en la cadena (depende de su
+        posición), o del campo si css es None. None sin datos.
+        """
+        counts = self.stats[field] if css is None else self.stats[field]["selectors"][css]
+        attempts = counts["lookups"] if css is None else counts["attempts"]
+        return counts["hits"] / attempts if attempts else None
+
+    def sampled_rate(self, field, css):
+        """Tasa de aciertos del selector en las muestras de la cadena completa (None sin datos)"""
+        counts = self.stats[field]["selectors"][css]
+        return counts["probe_hits"] / counts["probes"] if counts["probes"] else None
+
+    def order(self, field):
+        """Selectores del campo en el orden en que se prueban"""
+        chain = self.chains[field]
+        fallbacks = self.fallbacks.get(field, ())
+
+        def sort_key(item):
+            position, css = item
+            if field in self.keep_order:
+                return (self.is_dead(field, css), False, 0, position)
+            rate = self.sampled_rate(field, css)
+            # Sin datos: se respeta el orden original, delante de los que tienen tasa baja
+            return (self.is_dead(field, css), css in fallbacks, -(rate if rate is not None else 1.0), position)
+
+        return [css for _, css in sorted(enumerate(chain), key=sort_key)]
+
+    def _ordered(self, field):
+        """Orden en caché; se recalcula cada min_attempts búsquedas del campo"""
+        lookups = self.stats[field]["lookups"]
+        cached = self._orders.get(field)
+        if cached is None or lookups - cached[0] >= self.min_attempts:
+            cached = (lookups, self.order(field))
+            self._orders[field] = cached
+        return cached[1]
+
+    def _sampling(self, field):
+        """Esta búsqueda del campo prueba la cadena completa (una de cada sample_every)"""
+        return (field not in self.keep_order and self.sample_every
+                and self.stats[field]["lookups"] % self.sample_every == 0)
+
+    def _record_sample(self, field, found):
+        with self._lock:
+            for css, result in found.items():
+                counts = self.stats[field]["selectors"][css]
+                counts["probes"] += 1
+                if result:
+                    counts["probe_hits"] += 1
+
+    def _sample(self, node, field, order, method):
+        """Prueba toda la cadena, registra la muestra y retorna el resultado del orden actual"""
+        found = {css: getattr(node, method)(css) for css in order}
+        self._record_sample(field, found)
+        for position, css in enumerate(order):
+            if found[css]:
+                self._record(field, order[:position + 1], css)
+                return found[css]
+        self._record(field, order, None)
+        return None
+
+    def _record(self, field, tried, hit_css):
+        with self._lock:
+            field_stats = self.stats[field]
+            field_stats["lookups"] += 1
+            for css in tried:
+                field_stats["selectors"][css]["attempts"] += 1
+            if hit_css is not None:
+                field_stats["hits"] += 1
+                field_stats["selectors"][hit_css]["hits"] += 1
+
+    def select_one(self, node, field):
+        """Primer elemento que encuentra algún selector del campo (None si ninguno)"""
+        order = self._ordered(field)
+        if self._sampling(field):
+            return self._sample(node, field, order, "select_one")
+        tried = []
+        for css in order:
+            tried.append(css)
+            element = node.select_one(css)
+            if element:
+                self._record(field, tried, css)
+                return element
+        self._record(field, tried, None)
+        return None
+
+    def select(self, node, field):
+        """Elementos del primer selector del campo que encuentra alguno (lista vacía si ninguno)"""
+        order = self._ordered(field)
+        if self._sampling(field):
+            return self._sample(node, field, order, "select") or []
+        tried = []
+        for css in order:
+            tried.append(css)
+            elements = node.select(css)
+            if elements:
+                self._record(field, tried, css)
+                return elements
+        self._record(field, tried, None)
+        return []
+
+    def merge(self, stats):
+        """Suma las estadísticas de otro registro con las mismas cadenas (p. ej. de otro proceso)"""
+        with self._lock:
+            for field, other in stats.items():
+                if field not in self.stats:
+                    continue
+                self.stats[field]["lookups"] += other["lookups"]
+                self.stats[field]["hits"] += other["hits"]
+                for css, counts in other["selectors"].items():
+                    if css in self.stats[field]["selectors"]:
+                        for counter in _COUNTERS:
+                            self.stats[field]["selectors"][css][counter] += counts.get(counter, 0)
+
+    def snapshot(self):
+        """Copia de las estadísticas actuales (para calcular después lo que cambió)"""
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def delta_since(self, snapshot):
+        """Estadísticas acumuladas desde `snapshot`, en el formato que acepta merge()"""
+        with self._lock:
+            delta = {}
+            for field, current in self.stats.items():
+                before = snapshot[field]
+                delta[field] = {
+                    "lookups": current["lookups"] - before["lookups"],
+                    "hits": current["hits"] - before["hits"],
+                    "selectors": {
+                        css: {
+                            counter: counts[counter] - before["selectors"][css][counter]
+                            for counter in _COUNTERS
+                        }
+                        for css, counts in current["selectors"].items()
+                    },
+                }
+            return delta
+
+    def reset(self):
+        """Vacía las estadísticas (las cadenas no cambian)"""
+        with self._lock:
+            self.stats = {field: self._empty_field(selectors) for field, selectors in self.chains.items()}
+            self._orders = {}
+
+    def print_summary(self, drop_threshold=0.2):
+        """Muestra la tasa de aciertos por campo y selector, y avisa de las caídas"""
+        print("🎯 Aciertos de selectores:")
+        for field in self.chains:
+            rate = self.hit_rate(field)
+            if rate is None:
+                continue
+            previous = self.history.get(field)
+            trend = f" (antes {previous:.0%})" if previous is not None else ""
+            print(f"   {field}: {rate:.0%} de {self.stats[field]['lookups']} búsquedas{trend}")
+            if previous is not None and previous - rate >= drop_threshold:
+                print(f"   ⚠️ La tasa de aciertos de '{field}' cayó: ¿cambió el diseño de la página?")
+            for css in self.order(field):
+                css_rate = self.hit_rate(field, css)
+                sampled = self.sampled_rate(field, css)
+                if css_rate is None and sampled is None:
+                    continue
+                status = " (muerto)" if self.is_dead(field, css) else ""
+                in_chain = f"{css_rate:6.0%}" if css_rate is not None else "     -"
+                in_sample = f" (muestra {sampled:.0%})" if sampled is not None else ""
+                print(f"      {in_chain}  {css}{in_sample}{status}")
@@ -6,6 +6,11 @@ Ejecuta este script para verificar la conexión y crear las colecciones necesari
 """
 
 from db.mongo_config import connect_to_mongodb, close_mongodb_connection
+from db.listings import ensure_listing_indexes
+from db.listing_details import LISTING_DETAILS_COLLECTION, ensure_listing_details_collection
+from db.price_history import ensure_price_history_collection, record_price_observations
+from scrapper.listing_id import canonical_link, extract_listing_id
+from pymongo import UpdateOne
 from datetime import datetime
 
 def setup_rtx_collections():
@@ -85,6 +90,14 @@ def setup_rtx_collections():
         collection.create_index("scraped_date")
         print("   ✅ Índice en 'scraped_date' creado")
         
+        # Índice para la paginación por keyset del dashboard (scraped_date, _id)
+        collection.create_index([("scraped_date", -1), ("_id", -1)])
+        print("   ✅ Índice compuesto 'scraped_date + _id' creado")
+        
+        # Índice para la actualización incremental del dashboard (fecha de escritura)
+        collection.create_index("ingested_at")
+        print("   ✅ Índice en 'ingested_at' creado")
+        
         # Índice en model_searched para búsquedas por modelo
         collection.create_index("model_searched")
         print("   ✅ Índice en 'model_searched' creado")
@@ -93,6 +106,18 @@ def setup_rtx_collections():
         collection.create_index([("series", 1), ("price_numeric", -1)])
         print("   ✅ Índice compuesto 'series + price_numeric' creado")
         
+        # Índice único por publicación (requiere haber migrado los duplicados)
+        if ensure_listing_indexes(collection):
+            print("   ✅ Índices únicos en 'listing_id' y 'listing_link' y en 'content_hash' creados")
+        
+        # Colección time-series del historial de precios
+        ensure_price_history_collection(db)
+        print("   ✅ Colección time-series 'rtx_price_history' lista")
+        
+        # Caché de especificaciones de las páginas de publicaciones
+        ensure_listing_details_collection(db)
+        print(f"   ✅ Colección '{LISTING_DETAILS_COLLECTION}' lista")
+        
         print("\n✅ Configuración de colecciones completada exitosamente!")
         
         # Mostrar información final
@@ -135,6 +160,81 @@ def clean_example_data():
     finally:
         close_mongodb_connection()
 
+def migrate_to_listing_ids():
+    """
+    Asigna listing_id a los documentos antiguos (a partir de post_link) y elimina
+    las copias repetidas de cada publicación, conservando la más reciente.
+    """
+    print("🔁 Migrando a una fila por publicación...")
+    
+    db = connect_to_mongodb()
+    if db is None:
+        print("❌ No se pudo conectar a MongoDB")
+        return
+    
+    try:
+        collection = db["rtx_graphics_cards_peru"]
+        
+        # 1. Completar listing_id (o listing_link si el enlace no trae ID) en los documentos que no lo tienen
+        operations = []
+        backfilled = 0
+        missing = {"$or": [
+            {"listing_id": {"$exists": False}},
+            {"listing_id": None, "listing_link": {"$exists": False}},
+        ]}
+        for doc in collection.find(missing, {"post_link": 1}):
+            listing_id = extract_listing_id(doc.get("post_link"))
+            identity = {"listing_id": listing_id}
+            if not listing_id and doc.get("post_link"):
+                identity["listing_link"] = canonical_link(doc["post_link"])
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": identity}))
+            if len(operations) >= 1000:
+                backfilled += collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            backfilled += collection.bulk_write(operations, ordered=False).modified_count
+        print(f"🆔 {backfilled} documentos con listing_id asignado")
+        
+        # 1b. Pasar al historial de precios las observaciones de las copias repetidas
+        price_history = ensure_price_history_collection(db)
+        if price_history.count_documents({}) == 0:
+            observations = record_price_observations(
+                price_history,
+                collection.find(
+                    {"listing_id": {"$type": "string"}},
+                    {"listing_id": 1, "scraped_date": 1, "price_numeric": 1}
+                )
+            )
+            print(f"📈 {observations} observaciones de precio copiadas al historial")
+        
+        # 2. Eliminar duplicados: conservar el documento más reciente de cada publicación
+        duplicates = collection.aggregate([
+            {"$match": {"$or": [{"listing_id": {"$type": "string"}}, {"listing_link": {"$type": "string"}}]}},
+            {"$sort": {"scraped_date": -1}},
+            {"$group": {
+                "_id": {"$ifNull": ["$listing_id", "$listing_link"]},
+                "ids": {"$push": "$_id"},
+                "count": {"$sum": 1}
+            }},
+            {"$match": {"count": {"$gt": 1}}}
+        ], allowDiskUse=True)
+        
+        deleted = 0
+        for group in duplicates:
+            result = collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+            deleted += result.deleted_count
+        print(f"🗑️ {deleted} copias duplicadas eliminadas")
+        
+        # 3. Crear el índice único
+        if ensure_listing_indexes(collection):
+            print("✅ Índices únicos en 'listing_id' y 'listing_link' creados")
+    
+    except Exception as e:
+        print(f"❌ Error migrando publicaciones: {e}")
+    
+    finally:
+        close_mongodb_connection()
+
 def show_collection_info():
     """Muestra información detallada de las colecciones"""
     print("📊 Información de colecciones...")
@@ -192,9 +292,10 @@ if __name__ == "__main__":
         print("1. 🔧 Configurar colecciones")
         print("2. 📊 Mostrar información")
         print("3. 🧹 Limpiar datos de ejemplo")
-        print("4. 🚪 Salir")
+        print("4. 🔁 Migrar a una fila por publicación (listing_id)")
+        print("5. 🚪 Salir")
         
-        option = input("\nSelecciona una opción (1-4): ").strip()
+        option = input("\nSelecciona una opción (1-5): ").strip()
         
         if option == "1":
             setup_rtx_collections()
@@ -203,6 +304,8 @@ if __name__ == "__main__":
         elif option == "3":
             clean_example_data()
         elif option == "4":
+            migrate_to_listing_ids()
+        elif option == "5":
             print("👋 ¡Hasta luego!")
             break
         else:
@@ -0,0 +1,206 @@
+# tests/test_dashboard_live.py
+
+import sys
+import threading
+import time
+import types
+
+import mongomock
+import pytest
+from pymongo.errors import OperationFailure
+
+try:
+    import flet  # noqa: F401
+except ImportError:
+    # Solo se prueba la lógica de datos: basta con la clase base del dashboard
+    fake_flet = types.ModuleType("flet")
+    fake_flet.Container = type("Container", (), {})
+    sys.modules["flet"] = fake_flet
+
+from db.listing_pager import KeysetPager
+from ui.rtx_dashboard import TABLE_FIELDS, RTXDashboard
+from utils.dataframe_tools import RTX_SCHEMA, add_display_columns, mongo_to_dataframe
+
+
+def row(_id, date, series="RTX 40", title=None, price="2.499"):
+    return {
+        "_id": _id,
+        "ingested_at": date,
+        "model_searched": "RTX 4090" if series == "RTX 40" else "RTX 5080",
+        "title": title or f"Tarjeta {_id}",
+        "price_text": price,
+        "series": series,
+        "scraped_date": date,
+        "post_link": f"https://articulo.mercadolibre.com.pe/MLP-{_id}-x-_JM",
+    }
+
+
+@pytest.fixture
+def dashboard():
+    """Dashboard con dos filas cargadas, sin interfaz ni conexión real"""
+    collection = mongomock.MongoClient().db.rtx_graphics_cards_peru
+    loaded = [row("b", "2026-01-02T10:00:00"), row("a", "2026-01-01T10:00:00", series="RTX 50")]
+    collection.insert_many([dict(doc) for doc in loaded])
+
+    d = RTXDashboard.__new__(RTXDashboard)
+    d.collection = collection
+    d.current_filter = "Todas"
+    d.page_size = 50
+    d.page_index = 0
+    d.pager = KeysetPager(collection, TABLE_FIELDS, page_size=50)
+    d.df = add_display_columns(mongo_to_dataframe(d.pager.fetch_next(), schema=RTX_SCHEMA))
+    d.stats = None
+    d.calls = []
+    d.update_statistics = lambda: d.calls.append("stats")
+    d.show_stats_cards = lambda stats: d.calls.append("cards")
+    d.update_data_table = lambda: d.calls.append("table")
+    d.load_all_data = lambda notify=True: d.calls.append("reload")
+    return d
+
+
+def test_live_rows_are_merged_newest_first(dashboard):
+    dashboard.apply_live_rows([
+        row("c", "2026-01-03T10:00:00"),
+        row("a", "2026-01-04T10:00:00", series="RTX 50", price="1.999"),
+    ])
+    assert list(dashboard.df["_id"]) == ["a", "c", "b"]
+    updated = dashboard.df[dashboard.df["_id"] == "a"].iloc[0]
+    assert updated["price_text"] == "1.999"
+    assert dashboard.pager.high_water == "2026-01-04T10:00:00"
+    assert dashboard.calls == ["stats", "table"]
+
+
+def test_repeated_document_in_batch_keeps_last(dashboard):
+    dashboard.apply_live_rows([
+        row("c", "2026-01-03T10:00:00", title="Primera versión"),
+        row("c", "2026-01-03T11:00:00", title="Segunda versión"),
+    ])
+    titles = dashboard.df.loc[dashboard.df["_id"] == "c", "title"].tolist()
+    assert titles == ["Segunda versión"]
+    assert len(dashboard.df) == 3
+
+
+def test_rows_of_other_series_are_ignored_when_filtered(dashboard):
+    dashboard.current_filter = "RTX 40"
+    before = list(dashboard.df["_id"])
+    dashboard.apply_live_rows([row("z", "2026-01-05T10:00:00", series="RTX 50")])
+    assert list(dashboard.df["_id"]) == before
+    assert dashboard.calls == []
+
+
+def test_empty_dashboard_reloads(dashboard):
+    dashboard.df = dashboard.df.iloc[0:0]
+    dashboard.apply_live_rows([row("c", "2026-01-03T10:00:00")])
+    assert dashboard.calls == ["reload"]
+
+
+def test_live_rows_are_folded_into_the_stats(dashboard):
+    dashboard.stats = {
+        "total": 2, "series_counts": {"RTX 40": 1, "RTX 50": 1},
+        "price": {"count": 2, "sum": 5000.0, "avg": 2500.0, "min": 2000.0, "max": 3000.0, "median": 2500.0},
+        "price_by_series": {
+            "RTX 40": {"count": 1, "sum": 2000.0, "avg": 2000.0, "min": 2000.0, "max": 2000.0},
+            "RTX 50": {"count": 1, "sum": 3000.0, "avg": 3000.0, "min": 3000.0, "max": 3000.0},
+        },
+        "price_ranges": [("a", 0), ("b", 0), ("c", 1), ("d", 1), ("e", 0)],
+        "model_counts": {"RTX 4090": 1, "RTX 5080": 1},
+        "top_models": [("RTX 4090", 1), ("RTX 5080", 1)],
+        "last_ingested": "2026-01-02T10:00:00",
+    }
+    dashboard.apply_live_rows([dict(row("c", "2026-01-03T10:00:00"), price_numeric=2400.0, previous=None)])
+    assert dashboard.calls == ["cards", "table"]
+    assert dashboard.stats["total"] == 3
+    assert dashboard.stats["price"]["avg"] == pytest.approx(7400 / 3)
+    assert dashboard.stats["price"]["median"] is None
+
+
+class FakeChangeStream:
+    """Change stream de un replica set: entrega los cambios de a uno, como try_next()"""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.alive = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.alive = False
+
+    def try_next(self):
+        time.sleep(0.01)  # max_await_time_ms
+        return self.changes.pop(0) if self.changes else None
+
+
+class FakeReplicaSet:
+    """Colección con change streams (o sin ellos, con supported=False)"""
+
+    def __init__(self, changes=(), supported=True):
+        self.changes = changes
+        self.supported = supported
+        self.streams = 0
+
+    def watch(self, pipeline, **kwargs):
+        if not self.supported:
+            raise OperationFailure("The $changeStream stage is only supported on replica sets")
+        self.streams += 1
+        return FakeChangeStream(self.changes)
+
+
+@pytest.fixture
+def watcher(dashboard):
+    dashboard.watch_batch_seconds = 0.05
+    dashboard.poll_interval_seconds = 0.01
+    dashboard._watch_thread = None
+    dashboard._watch_stop = threading.Event()
+    dashboard.batches = []
+    dashboard.queue_live_changes = dashboard.batches.append
+    yield dashboard
+    dashboard.stop_watch()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_change_stream_changes_are_batched(watcher):
+    watcher.collection = FakeReplicaSet([
+        {"operationType": "insert", "fullDocument": row("c", "2026-01-03T10:00:00")},
+        {"operationType": "update", "fullDocument": row("a", "2026-01-04T10:00:00")},
+        {"operationType": "update", "fullDocument": None},  # Documento ya borrado
+    ])
+    watcher.start_watch()
+    assert wait_for(lambda: watcher.batches)
+    assert [[doc["_id"] for doc in batch] for batch in watcher.batches] == [["c", "a"]]
+
+
+def test_without_replica_set_falls_back_to_polling(watcher):
+    polls = []
+    watcher.collection = FakeReplicaSet(supported=False)
+    watcher.run_in_background = lambda task, message=None, key=None: polls.append(key)
+    watcher.start_watch()
+    assert wait_for(lambda: len(polls) >= 2)
+    assert set(polls) == {"refresh"}
+
+    watcher.stop_watch()
+    time.sleep(0.05)
+    count = len(polls)
+    time.sleep(0.05)
+    assert len(polls) == count
+
+
+def test_quick_restart_leaves_a_single_watcher(watcher):
+    watcher.collection = FakeReplicaSet()
+    watcher.start_watch()
+    first = watcher._watch_thread
+    watcher.stop_watch()
+    watcher.start_watch()  # Antes de que el primer hilo vea su evento
+    second = watcher._watch_thread
+
+    assert second is not first
+    first.join(timeout=1.0)
+    assert not first.is_alive()
+    assert second.is_alive()
@@ -0,0 +1,84 @@
+# tests/test_dashboard_stats.py
+
+import mongomock
+import pytest
+
+from db import dashboard_stats
+from db.dashboard_stats import fetch_dashboard_stats, fold_documents
+from db.listings import upsert_listings
+
+
+def listing(number, price, model="RTX 4090", series="RTX 40", date="2026-01-01T10:00:00"):
+    return {
+        "listing_id": f"MLP10000000{number}",
+        "model_searched": model,
+        "title": f"Tarjeta {number}",
+        "price_numeric": price,
+        "series": series,
+        "post_link": f"https://articulo.mercadolibre.com.pe/MLP-10000000{number}-x-_JM",
+        "scraped_date": date,
+    }
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    # mongomock no tiene $median: la agregación se prueba sin ella
+    build = dashboard_stats.build_stats_pipeline
+    monkeypatch.setattr(dashboard_stats, "build_stats_pipeline", lambda series=None, with_median=True: build(series, False))
+    collection = mongomock.MongoClient().db.rtx_graphics_cards_peru
+    upsert_listings(collection, [
+        listing(1, 1500.0), listing(2, 2500.0), listing(3, 3100.0),
+        listing(5, 4200.0, model="RTX 5080", series="RTX 50"),
+    ])
+    return collection
+
+
+def written_since(collection, stats):
+    return list(collection.find({"ingested_at": {"$gt": stats["last_ingested"]}}))
+
+
+def comparable(stats):
+    stats = dict(stats, price=dict(stats["price"], median=None))
+    stats.pop("folded", None)
+    stats.pop("last_ingested")
+    stats["top_models"] = sorted(stats["top_models"])
+    return stats
+
+
+def test_new_and_updated_documents_match_a_full_aggregation(collection):
+    stats = fetch_dashboard_stats(collection)
+    upsert_listings(collection, [
+        listing(2, 2300.0, date="2026-01-02T10:00:00"),  # Cambia de precio (no es extremo)
+        listing(4, 900.0, model="RTX 4060", date="2026-01-02T10:00:00"),  # Nueva
+    ])
+    folded = fold_documents(stats, written_since(collection, stats))
+    assert folded is not None
+    assert comparable(folded) == comparable(fetch_dashboard_stats(collection))
+    assert folded["price"]["median"] is None
+
+
+def test_filtered_stats_ignore_other_series(collection):
+    stats = fetch_dashboard_stats(collection, "RTX 50")
+    upsert_listings(collection, [listing(4, 900.0, model="RTX 4060", date="2026-01-02T10:00:00")])
+    folded = fold_documents(stats, written_since(collection, stats), "RTX 50")
+    assert comparable(folded) == comparable(fetch_dashboard_stats(collection, "RTX 50"))
+
+
+def test_already_counted_documents_are_skipped(collection):
+    stats = fetch_dashboard_stats(collection)
+    folded = fold_documents(stats, list(collection.find()))
+    assert comparable(folded) == comparable(stats)
+
+
+def test_removing_the_minimum_needs_an_aggregation(collection):
+    stats = fetch_dashboard_stats(collection)
+    upsert_listings(collection, [listing(1, 1800.0, date="2026-01-02T10:00:00")])
+    assert fold_documents(stats, written_since(collection, stats)) is None
+
+
+def test_version_written_after_the_stats_needs_an_aggregation(collection):
+    stats = fetch_dashboard_stats(collection)
+    upsert_listings(collection, [listing(4, 900.0, date="2026-01-02T10:00:00")])
+    upsert_listings(collection, [listing(4, 950.0, date="2026-01-03T10:00:00")])
+    # Solo llega la segunda versión: la primera nunca se sumó
+    assert fold_documents(stats, written_since(collection, stats)) is None
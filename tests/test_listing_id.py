@@ -0,0 +1,42 @@
+# tests/test_listing_id.py
+
+from scrapper.listing_id import canonical_link, extract_listing_id, listing_key
+
+
+def test_item_link():
+    url = "https://articulo.mercadolibre.com.pe/MLP-451234567-tarjeta-de-video-asus-rog-strix-rtx-4090-24gb-_JM"
+    assert extract_listing_id(url) == "MLP451234567"
+
+
+def test_item_link_without_dash_and_relative():
+    assert extract_listing_id("https://articulo.mercadolibre.com.pe/MLP454567890-zotac-_JM") == "MLP454567890"
+    assert extract_listing_id("/MLP-453456789-gigabyte-rtx-4090-windforce-_JM") == "MLP453456789"
+
+
+def test_catalog_link_uses_wid():
+    url = ("https://www.mercadolibre.com.pe/msi-geforce-rtx-4090-gaming-x-trio/p/MLP24161234"
+           "#polycard_client=search-nordic&wid=MLP452345678&sid=search")
+    assert extract_listing_id(url) == "MLP452345678"
+
+
+def test_catalog_link_without_wid_has_no_listing_id():
+    url = "https://www.mercadolibre.com.pe/msi-geforce-rtx-5080-ventus-3x-oc/p/MLP45123456"
+    assert extract_listing_id(url) is None
+    # Se identifica por el enlace, sin el fragmento de seguimiento
+    assert listing_key({"post_link": url + "#polycard_client=search-nordic&tracking_id=abc"}) == url
+
+
+def test_ad_click_link():
+    url = "https://click1.mercadolibre.com.pe/mclics/clicks/external/MLP/count?a=MLP-463456789"
+    assert extract_listing_id(url) == "MLP463456789"
+
+
+def test_missing_link():
+    assert extract_listing_id(None) is None
+    assert extract_listing_id("https://www.mercadolibre.com.pe/ofertas") is None
+
+
+def test_canonical_link_drops_tracking():
+    url = "https://www.mercadolibre.com.pe/x/p/MLP24161234#polycard_client=search-nordic&wid=MLP452345678&sid=search"
+    assert canonical_link(url) == "https://www.mercadolibre.com.pe/x/p/MLP24161234"
+    assert canonical_link(None) == ""
@@ -0,0 +1,95 @@
+# tests/test_listing_pager.py
+
+import mongomock
+import pytest
+
+from db.listing_pager import KeysetPager
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.listings
+    # Dos documentos por fecha para probar el desempate por _id
+    collection.insert_many([
+        {"_id": i, "scraped_date": f"2026-01-{1 + i // 2:02d}", "series": "RTX 40" if i % 3 else "RTX 50"}
+        for i in range(10)
+    ])
+    return collection
+
+
+def ids(documents):
+    return [doc["_id"] for doc in documents]
+
+
+def test_pages_follow_keyset_order(collection):
+    pager = KeysetPager(collection, ["series", "scraped_date"], page_size=4)
+    pages = [pager.fetch_next() for _ in range(3)]
+    assert ids(pages[0]) == [9, 8, 7, 6]
+    assert ids(pages[1]) == [5, 4, 3, 2]
+    assert ids(pages[2]) == [1, 0]
+    assert not pager.has_more
+    assert pager.fetch_next() == []
+
+
+def test_keyset_query_after_last_key(collection):
+    pager = KeysetPager(collection, ["scraped_date"], page_size=3)
+    pager.fetch_next()
+    assert pager.last_key == ("2026-01-04", 7)
+    assert pager.keyset_query() == {"$or": [
+        {"scraped_date": {"$lt": "2026-01-04"}},
+        {"scraped_date": "2026-01-04", "_id": {"$lt": 7}},
+    ]}
+
+
+def test_base_query_is_combined(collection):
+    pager = KeysetPager(collection, ["series", "scraped_date"], query={"series": "RTX 50"}, page_size=2)
+    first = pager.fetch_next()
+    second = pager.fetch_next()
+    assert ids(first) == [9, 6]
+    assert ids(second) == [3, 0]
+    assert "$and" in pager.keyset_query()
+
+
+def test_fetch_newer_uses_high_water_mark(collection):
+    collection.update_many({}, {"$set": {"ingested_at": "2026-01-05T12:00:00"}})
+    pager = KeysetPager(collection, ["scraped_date"], page_size=4)
+    pager.fetch_next()
+    assert pager.high_water == "2026-01-05T12:00:00"
+    assert pager.fetch_newer() == []
+
+    collection.insert_many([
+        {"_id": 10, "scraped_date": "2026-01-06", "ingested_at": "2026-01-06T12:00:00"},
+        # Re-extraído del archivo: fecha de página vieja, escrito después
+        {"_id": 11, "scraped_date": "2025-12-01", "ingested_at": "2026-01-06T12:00:00"},
+    ])
+    assert ids(pager.fetch_newer()) == [10, 11]
+    assert pager.high_water == "2026-01-06T12:00:00"
+    assert pager.fetch_newer() == []
+
+
+def test_batch_seen_in_halves_is_completed(collection):
+    pager = KeysetPager(collection, ["scraped_date"], page_size=4)
+    pager.fetch_next()
+    collection.insert_one({"_id": 10, "scraped_date": "2026-01-06", "ingested_at": "2026-01-06T12:00:00"})
+    assert ids(pager.fetch_newer()) == [10]
+    # El resto del mismo lote (misma fecha de escritura) llega después
+    collection.insert_one({"_id": 11, "scraped_date": "2026-01-06", "ingested_at": "2026-01-06T12:00:00"})
+    assert ids(pager.fetch_newer()) == [11]
+
+
+def test_legacy_documents_are_not_newer(collection):
+    # Sin ingested_at (escritos antes de la marca de agua): no son novedades
+    pager = KeysetPager(collection, ["scraped_date"], page_size=4)
+    pager.fetch_next()
+    assert pager.high_water is None
+    assert pager.fetch_newer() == []
+
+
+def test_advance_high_water_mark(collection):
+    pager = KeysetPager(collection, ["scraped_date"], page_size=4)
+    pager.fetch_next()
+    pager.advance_high_water_mark([{"_id": 20, "ingested_at": "2026-02-01T00:00:00"}, {"_id": 21, "ingested_at": None}])
+    assert pager.high_water == "2026-02-01T00:00:00"
+    # Un documento escrito antes no la retrocede
+    pager.advance_high_water_mark([{"_id": 1, "ingested_at": "2026-01-01T00:00:00"}])
+    assert pager.high_water == "2026-02-01T00:00:00"
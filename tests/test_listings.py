@@ -0,0 +1,98 @@
+# tests/test_listings.py
+
+import mongomock
+import pytest
+
+from db.listings import content_hash, upsert_listings
+
+
+def listing(listing_id, price=2499.0, date="2026-01-01T10:00:00", **fields):
+    doc = {
+        "listing_id": listing_id,
+        "model_searched": "RTX 4090",
+        "title": f"Tarjeta {listing_id}",
+        "price_text": f"{int(price):,}".replace(",", "."),
+        "price_numeric": price,
+        "series": "RTX 40",
+        "post_link": f"https://articulo.mercadolibre.com.pe/{listing_id[:3]}-{listing_id[3:]}-x-_JM",
+        "image_link": "https://http2.mlstatic.com/D_NQ_NP_812345-MLA80000001_102024-O.webp",
+        "scraped_date": date,
+        "country": "Peru",
+        "source": "MercadoLibre",
+    }
+    doc.update(fields)
+    return doc
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.rtx_graphics_cards_peru
+
+
+def test_insert_then_unchanged(collection):
+    docs = [listing("MLP100000001"), listing("MLP100000002")]
+    stats = upsert_listings(collection, docs)
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (2, 0, 0)
+
+    later = [dict(doc, scraped_date="2026-01-02T10:00:00") for doc in docs]
+    stats = upsert_listings(collection, later)
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 0, 2)
+    assert collection.count_documents({}) == 2
+
+
+def test_changed_price_is_updated(collection):
+    upsert_listings(collection, [listing("MLP100000001")])
+    stats = upsert_listings(collection, [listing("MLP100000001", price=2299.0, date="2026-01-02T10:00:00")])
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 1, 0)
+    stored = collection.find_one({"listing_id": "MLP100000001"})
+    assert stored["price_numeric"] == 2299.0
+    assert stored["first_seen"] == "2026-01-01T10:00:00"
+    assert stored["ingested_at"] > stored["scraped_date"]
+
+
+def test_run_noise_does_not_count_as_change(collection):
+    upsert_listings(collection, [listing("MLP100000001", price=2499.9)])
+    noisy = listing(
+        "MLP100000001", price=2499.0, date="2026-01-02T10:00:00",
+        model_searched="GeForce RTX 4090",
+        post_link="https://articulo.mercadolibre.com.pe/MLP-100000001-x-_JM#polycard_client=search&sid=abc",
+        image_link="https://http2.mlstatic.com/D_NQ_NP_2X_812345-MLA80000001_102024-F.webp",
+    )
+    stats = upsert_listings(collection, [noisy])
+    assert stats["unchanged"] == 1
+
+
+def test_older_version_is_not_written(collection):
+    upsert_listings(collection, [listing("MLP100000001", price=2299.0, date="2026-02-01T10:00:00")])
+    stats = upsert_listings(collection, [listing("MLP100000001", price=2499.0, date="2026-01-01T10:00:00")])
+    assert stats["stale"] == 1
+    assert collection.find_one({"listing_id": "MLP100000001"})["price_numeric"] == 2299.0
+
+
+def test_link_identity_and_skipped(collection):
+    catalog = dict(listing("MLP100000001"), listing_id=None, post_link="https://www.mercadolibre.com.pe/msi/p/MLP45123456")
+    no_identity = dict(listing("MLP100000002"), listing_id=None, post_link="")
+    stats = upsert_listings(collection, [catalog, no_identity])
+    assert (stats["inserted"], stats["skipped"]) == (1, 1)
+    assert upsert_listings(collection, [catalog])["unchanged"] == 1
+
+
+def test_duplicates_in_batch_keep_newest(collection):
+    old = listing("MLP100000001", price=2499.0, date="2026-01-02T10:00:00")
+    new = listing("MLP100000001", price=2299.0, date="2026-01-03T10:00:00")
+    stats = upsert_listings(collection, [new, old])
+    assert stats["inserted"] == 1
+    assert collection.find_one({"listing_id": "MLP100000001"})["content_hash"] == content_hash(new)
+
+
+def test_catalog_link_tracking_does_not_duplicate(collection):
+    link = "https://www.mercadolibre.com.pe/msi/p/MLP45123456"
+    first = dict(listing("MLP100000001"), listing_id=None, post_link=link + "#tracking_id=aaa")
+    second = dict(first, post_link=link + "#tracking_id=bbb", scraped_date="2026-01-02T10:00:00")
+    upsert_listings(collection, [first])
+    assert upsert_listings(collection, [second])["unchanged"] == 1
+
+    changed = dict(second, price_numeric=1999.0, post_link=link + "#tracking_id=ccc")
+    assert upsert_listings(collection, [changed])["updated"] == 1
+    assert collection.count_documents({}) == 1
+    assert collection.find_one()["listing_link"] == link
@@ -0,0 +1,72 @@
+# tests/test_query_planner.py
+
+import mongomock
+import pytest
+
+from scrapper.query_planner import QueryPlanner
+
+QUERIES = ["RTX 4090", "GeForce RTX 4090", "RTX 4080"]
+
+
+@pytest.fixture
+def history():
+    return mongomock.MongoClient().db.scraper_query_runs
+
+
+def add_run(history, date, results, probe=False):
+    history.insert_one({
+        "run_date": date,
+        "probe": probe,
+        "results": [{"query": query, "listing_ids": ids} for query, ids in results.items()],
+    })
+
+
+def overlapping_results():
+    return {
+        "RTX 4090": ["A", "B", "C", "D", "E"],
+        "GeForce RTX 4090": ["A", "B", "C", "D"],
+        "RTX 4080": ["X", "Y", "A"],
+    }
+
+
+def test_without_history_runs_everything(history):
+    plan = QueryPlanner(history).plan(QUERIES)
+    assert plan.probe
+    assert plan.queries == QUERIES
+    assert plan.saved_requests == 0
+
+
+def test_redundant_query_is_merged(history):
+    add_run(history, "2026-01-01", overlapping_results(), probe=True)
+    add_run(history, "2026-01-02", overlapping_results())
+    plan = QueryPlanner(history, overlap_threshold=0.9, probe_every=5).plan(QUERIES)
+    assert not plan.probe
+    assert plan.queries == ["RTX 4090", "RTX 4080"]
+    assert plan.merged == {"GeForce RTX 4090": "RTX 4090"}
+
+
+def test_partial_overlap_is_kept(history):
+    results = overlapping_results()
+    results["GeForce RTX 4090"] = ["A", "B", "Z1", "Z2"]
+    add_run(history, "2026-01-01", results, probe=True)
+    plan = QueryPlanner(history, overlap_threshold=0.9).plan(QUERIES)
+    assert plan.queries == QUERIES
+    assert plan.merged == {}
+
+
+def test_probe_every_n_runs(history):
+    for day in range(1, 6):
+        add_run(history, f"2026-01-0{day}", overlapping_results(), probe=day == 1)
+    plan = QueryPlanner(history, probe_every=5).plan(QUERIES)
+    # Las últimas 4 ejecuciones no fueron completas: toca medir de nuevo
+    assert plan.probe
+    assert plan.queries == QUERIES
+
+
+def test_record_run_keeps_latest(history):
+    planner = QueryPlanner(history)
+    plan = planner.plan(QUERIES)
+    for _ in range(3):
+        planner.record_run(plan, {"RTX 4090": {"B", "A"}}, max_stored_runs=2)
+    assert history.count_documents({}) == 2
+    assert history.find_one()["results"] == [{"query": "RTX 4090", "listing_ids": ["A", "B"]}]
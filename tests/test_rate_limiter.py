@@ -0,0 +1,90 @@
+# tests/test_rate_limiter.py
+
+import pytest
+
+from scrapper import rate_limiter
+from scrapper.rate_limiter import HostRateLimiter, backoff_delay, parse_retry_after
+
+
+class FakeClock:
+    """Reloj manual para time.monotonic/time.sleep"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def fake_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_additive_increase_up_to_max_rate():
+    limiter = HostRateLimiter(rate=2.0, max_rate=2.5, increase=0.1)
+    for _ in range(3):
+        limiter.on_success("h")
+    assert limiter.rate("h") == pytest.approx(2.3)
+    for _ in range(10):
+        limiter.on_success("h")
+    assert limiter.rate("h") == 2.5
+
+
+def test_multiplicative_decrease_once_per_burst(monkeypatch):
+    clock = fake_time(monkeypatch)
+    limiter = HostRateLimiter(rate=4.0, min_rate=0.5, decrease=0.5)
+    limiter.on_throttle("h")
+    limiter.on_throttle("h")  # Misma ráfaga: no vuelve a bajar
+    assert limiter.rate("h") == 2.0
+
+    clock.sleep(1.0)
+    limiter.on_throttle("h")
+    assert limiter.rate("h") == 1.0
+    for _ in range(5):
+        clock.sleep(10)
+        limiter.on_throttle("h")
+    assert limiter.rate("h") == 0.5
+
+
+def test_hosts_are_independent():
+    limiter = HostRateLimiter(rate=2.0)
+    limiter.on_throttle("a")
+    assert limiter.rate("a") == 1.0
+    assert limiter.rate("b") == 2.0
+
+
+def test_token_bucket_paces_requests(monkeypatch):
+    clock = fake_time(monkeypatch)
+    limiter = HostRateLimiter(rate=2.0, burst=2)
+    start = clock.now
+    waits = [limiter.acquire("h") for _ in range(4)]
+    # Dos tokens acumulados y luego uno cada 0.5 s
+    assert waits[:2] == [0.0, 0.0]
+    assert clock.now - start == 1.0
+
+
+def test_retry_after_blocks_host(monkeypatch):
+    clock = fake_time(monkeypatch)
+    limiter = HostRateLimiter(rate=100.0, burst=1)
+    limiter.on_throttle("h", retry_after=5)
+    start = clock.now
+    limiter.acquire("h")
+    assert clock.now - start >= 5
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("") is None
+    assert parse_retry_after("mañana") is None
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=30.0) <= min(30.0, 2 ** attempt)
@@ -0,0 +1,98 @@
+# tests/test_scraper.py
+
+import asyncio
+import threading
+import time
+
+import requests
+
+from scrapper.ideascraperMercadoLibre import Scraper
+from scrapper.rate_limiter import HostRateLimiter
+
+
+class FakeResponse:
+    status_code = 200
+    encoding = "utf-8"
+    content = b"<html></html>"
+
+
+class FakeParsePipeline:
+    """Cuenta cuántos parseos corren a la vez"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def parse(self, product_name, content, encoding, limit):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        return [{"title": product_name}], 1
+
+
+def make_scraper():
+    scraper = Scraper.__new__(Scraper)
+    scraper.base_url = "https://listado.mercadolibre.com.pe/"
+    scraper.max_concurrency = 4
+    scraper.http_cache = None
+    scraper.parse_pipeline = FakeParsePipeline()
+    scraper.data = []
+    scraper.fetch_page = lambda url, product_name=None, search_page=True: FakeResponse()
+    return scraper
+
+
+def test_pages_are_parsed_concurrently():
+    scraper = make_scraper()
+    models = ["RTX 4060", "RTX 4070", "RTX 4080", "RTX 4090"]
+    total = asyncio.run(scraper.scrape_models_async(models))
+    assert total == 4
+    assert sorted(doc["title"] for doc in scraper.data) == sorted(models)
+    assert scraper.parse_pipeline.max_in_flight > 1
+
+
+class TimeoutSession:
+    """Sesión que agota el tiempo de espera en las primeras peticiones"""
+
+    def __init__(self, timeouts):
+        self.timeouts = timeouts
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append(timeout)
+        if len(self.calls) <= self.timeouts:
+            raise requests.Timeout("read timed out")
+        return FakeResponse()
+
+
+def make_fetcher(session, monkeypatch, max_retries=3):
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    scraper = Scraper.__new__(Scraper)
+    scraper.session = session
+    scraper.http_cache = None
+    scraper.archive = None
+    scraper.max_retries = max_retries
+    scraper.request_timeout = (5, 30)
+    scraper._request_slots = threading.BoundedSemaphore(1)
+    scraper.rate_limiter = HostRateLimiter(rate=8.0, burst=10)
+    return scraper
+
+
+def test_timeout_is_retried_and_slows_host(monkeypatch):
+    session = TimeoutSession(timeouts=2)
+    scraper = make_fetcher(session, monkeypatch)
+    response = scraper.fetch_page("https://listado.mercadolibre.com.pe/rtx", search_page=False)
+    assert response.status_code == 200
+    assert session.calls == [(5, 30)] * 3
+    # Dos timeouts: la tasa se reduce a la mitad dos veces (y sube un poco con el acierto)
+    assert scraper.rate_limiter.rate("listado.mercadolibre.com.pe") < 8.0 / 2
+
+
+def test_timeout_gives_up_after_retries(monkeypatch):
+    session = TimeoutSession(timeouts=10)
+    scraper = make_fetcher(session, monkeypatch, max_retries=2)
+    assert scraper.fetch_page("https://listado.mercadolibre.com.pe/rtx", search_page=False) is None
+    assert len(session.calls) == 3
@@ -0,0 +1,81 @@
+# tests/test_selector_registry.py
+
+from scrapper.selector_registry import SelectorRegistry
+
+
+class FakeCard:
+    """Tarjeta con los selectores que encuentra"""
+
+    def __init__(self, *found):
+        self.found = set(found)
+
+    def select_one(self, css):
+        return css if css in self.found else None
+
+    def select(self, css):
+        return [css] if css in self.found else []
+
+
+def run(registry, cards, rounds=10):
+    for _ in range(rounds):
+        for card in cards:
+            registry.select_one(card, "title")
+
+
+def test_reorders_by_sampled_rate():
+    # "nuevo" acierta en todas las tarjetas; "viejo" solo en la mitad. En la cadena,
+    # "nuevo" solo se prueba donde "viejo" falló: solo las muestras lo adelantan.
+    registry = SelectorRegistry({"title": ["viejo", "nuevo"]}, min_attempts=5, sample_every=3)
+    run(registry, [FakeCard("viejo", "nuevo"), FakeCard("nuevo")])
+    assert registry.sampled_rate("title", "nuevo") == 1.0
+    assert registry.sampled_rate("title", "viejo") < 1.0
+    assert registry.order("title") == ["nuevo", "viejo"]
+
+
+def test_without_samples_keeps_chain_order():
+    registry = SelectorRegistry({"title": ["viejo", "nuevo"]}, min_attempts=5, sample_every=0)
+    run(registry, [FakeCard("viejo", "nuevo"), FakeCard("nuevo")])
+    # La tasa condicional de "nuevo" (100%) no lo adelanta
+    assert registry.hit_rate("title", "nuevo") == 1.0
+    assert registry.order("title") == ["viejo", "nuevo"]
+
+
+def test_fallback_stays_last():
+    registry = SelectorRegistry({"title": ["especifico", "a"]}, min_attempts=5, sample_every=3,
+                                fallbacks={"title": ["a"]})
+    run(registry, [FakeCard("especifico", "a"), FakeCard("a")])
+    assert registry.sampled_rate("title", "a") > registry.sampled_rate("title", "especifico")
+    assert registry.order("title") == ["especifico", "a"]
+
+
+def test_dead_selector_goes_last_even_in_keep_order():
+    registry = SelectorRegistry({"title": ["muerto", "vivo"]}, min_attempts=5, keep_order=("title",))
+    run(registry, [FakeCard("vivo")])
+    assert registry.is_dead("title", "muerto")
+    assert registry.order("title") == ["vivo", "muerto"]
+
+
+def test_sample_returns_first_hit_in_current_order():
+    registry = SelectorRegistry({"title": ["uno", "dos"]}, sample_every=1)
+    assert registry.select_one(FakeCard("uno", "dos"), "title") == "uno"
+    assert registry.select(FakeCard(), "title") == []
+    assert registry.stats["title"]["lookups"] == 2
+    assert registry.stats["title"]["selectors"]["dos"]["probes"] == 2
+
+
+def test_merge_delta_and_old_files(tmp_path):
+    path = tmp_path / "stats.json"
+    # Archivo anterior a las muestras: solo intentos y aciertos
+    path.write_text('{"fields": {"title": {"lookups": 4, "hits": 4, '
+                    '"selectors": {"uno": {"attempts": 4, "hits": 4}}}}}')
+    registry = SelectorRegistry({"title": ["uno", "dos"]}, path=str(path), decay=1.0, sample_every=1)
+    assert registry.stats["title"]["selectors"]["uno"] == {"attempts": 4, "hits": 4, "probes": 0, "probe_hits": 0}
+
+    before = registry.snapshot()
+    registry.select_one(FakeCard("dos"), "title")
+    delta = registry.delta_since(before)
+    assert delta["title"]["selectors"]["dos"] == {"attempts": 1, "hits": 1, "probes": 1, "probe_hits": 1}
+
+    other = SelectorRegistry({"title": ["uno", "dos"]})
+    other.merge(delta)
+    assert other.sampled_rate("title", "dos") == 1.0
@@ -4,7 +4,7 @@ import flet as ft
 import pandas as pd
 from datetime import datetime, timedelta
 from db.queries import find_documents
-from utils.dataframe_tools import mongo_to_dataframe, clean_and_format_dataframe
+from utils.dataframe_tools import mongo_to_dataframe, clean_and_format_dataframe, format_table_cells
 from api.fetch_matches import (
     fetch_and_store_cs_all_data_hltv, 
     fetch_cs_players_hltv_only, 
@@ -169,16 +169,13 @@ class Dashboard(ft.Column):
             )
         self.data_table.columns = columns
 
-        # Crear filas
-        rows = []
-        for index, row in df.iterrows():
-            cells = []
-            for col in df.columns:
-                if col == "_id":
-                    continue
-                cell_value = str(row[col]) if pd.notna(row[col]) else ""
-                cells.append(ft.DataCell(ft.Text(cell_value[:50])))  # Limitar texto
-            rows.append(ft.DataRow(cells))
+        # Crear filas: el texto de las celdas se calcula columna por columna
+        visible_columns = [col for col in df.columns if col != "_id"]
+        cell_texts = format_table_cells(df[visible_columns], max_length=50)  # Limitar texto
+        rows = [
+            ft.DataRow([ft.DataCell(ft.Text(value)) for value in values])
+            for values in cell_texts.itertuples(index=False, name=None)
+        ]
         
         self.data_table.rows = rows
         self.data_table.visible = True
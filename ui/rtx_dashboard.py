@@ -2,23 +2,65 @@
 
 import flet as ft
 import pandas as pd
-from datetime import datetime
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pymongo.errors import PyMongoError
 
 # Agregar el directorio padre al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.mongo_config import connect_to_mongodb
-from utils.dataframe_tools import mongo_to_dataframe, clean_and_format_dataframe
+from db.dashboard_stats import fetch_dashboard_stats, fetch_price_median, fold_documents
+from db.listing_pager import KeysetPager
+from utils.dataframe_tools import (
+    mongo_to_dataframe, add_display_columns, concat_frames,
+    memory_usage_mb, DISPLAY_COLUMNS, RTX_SCHEMA
+)
+from utils.exporter import export_collection
+
+# Campos que muestra la tabla: solo estos se leen de MongoDB
+TABLE_FIELDS = ["model_searched", "title", "price_text", "series", "scraped_date", "post_link"]
+# Campos que se leen además de los documentos nuevos o actualizados, para sumarlos
+# a las estadísticas sin volver a agregar toda la colección
+STATS_FIELDS = ["price_numeric", "previous"]
 
 class RTXDashboard(ft.Container):
-    def __init__(self):
+    def __init__(self, page_size=50):
         super().__init__()
         self.db = None
         self.collection = None
-        self.df = pd.DataFrame()
-        self.filtered_df = pd.DataFrame()
+        self.df = pd.DataFrame()  # Filas del filtro actual ya leídas de MongoDB, en orden de fecha
         self.current_filter = "Todas"  # Filtro actual
+        self.stats = None  # Estadísticas calculadas en MongoDB para el filtro actual
+        
+        # Paginación de la tabla: las filas se piden a MongoDB página a página
+        self.page_size = page_size
+        self.page_index = 0
+        self.pager = None
+        
+        # Actualización incremental: si llegan más documentos nuevos que este
+        # límite, se recarga todo desde la primera página
+        self.max_incremental_rows = 5000
+        
+        # Modo en vivo: change stream de MongoDB (o consultas periódicas si no está disponible)
+        self.watch_batch_seconds = 2.0   # Ventana para agrupar cambios antes de aplicarlos
+        self.poll_interval_seconds = 15  # Intervalo de consulta si no hay change streams
+        self._watch_thread = None
+        self._watch_stop = threading.Event()  # Evento del hilo actual (cada hilo tiene el suyo)
+        self.live_switch = ft.Switch(label="📡 En vivo", value=False, on_change=self.toggle_watch)
+        
+        # Hilo de trabajo para las lecturas de MongoDB: la interfaz no se bloquea
+        # mientras responde la base de datos. Las tareas se ejecutan de a una.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rtx-dashboard")
+        self._task_lock = threading.Lock()
+        self._queued_tasks = set()
+        self._running_tasks = 0
+        
+        # Indicador de carga
+        self.progress_ring = ft.ProgressRing(width=20, height=20, stroke_width=3, visible=False)
+        self.status_text = ft.Text("", size=12, color=ft.colors.GREY_700, visible=False)
         
         # Configuración del container principal
         self.expand = True
@@ -30,7 +72,8 @@ class RTXDashboard(ft.Container):
         # Crear la interfaz
         self.content = self.build_interface()
         
-        # No cargar datos automáticamente aquí - se hará desde main.py
+        # No cargar datos automáticamente aquí - main.py llama a auto_load_data()
+        # después de agregar el dashboard a la página
         
     def init_database(self):
         """Inicializa la conexión a MongoDB"""
@@ -103,6 +146,16 @@ class RTXDashboard(ft.Container):
                                 bgcolor="#7b1fa2",
                                 color="#ffffff"
                             ),
+                            ft.ElevatedButton(
+                                text="📦 Descargar Parquet",
+                                icon=ft.icons.DOWNLOAD,
+                                on_click=self.download_parquet,
+                                bgcolor="#512da8",
+                                color="#ffffff"
+                            ),
+                            self.live_switch,
+                            self.progress_ring,
+                            self.status_text,
                         ],
                         alignment=ft.MainAxisAlignment.CENTER,
                         spacing=10,
@@ -165,56 +218,223 @@ class RTXDashboard(ft.Container):
     
     def create_data_table(self):
         """Crea la tabla de datos"""
+        self.build_table()
         return ft.Container(
             content=ft.Column(
                 [
                     ft.Text("📋 Datos de Gráficas RTX", size=20, weight=ft.FontWeight.BOLD),
                     ft.Container(
-                        content=ft.DataTable(
-                            columns=[
-                                ft.DataColumn(ft.Text("Modelo", weight=ft.FontWeight.BOLD)),
-                                ft.DataColumn(ft.Text("Título", weight=ft.FontWeight.BOLD)),
-                                ft.DataColumn(ft.Text("Precio", weight=ft.FontWeight.BOLD)),
-                                ft.DataColumn(ft.Text("Serie", weight=ft.FontWeight.BOLD)),
-                                ft.DataColumn(ft.Text("Fecha", weight=ft.FontWeight.BOLD)),
-                                ft.DataColumn(ft.Text("Acciones", weight=ft.FontWeight.BOLD)),
-                            ],
-                            rows=[],
-                            border=ft.border.all(1, ft.colors.GREY_300),
-                            border_radius=10,
-                            vertical_lines=ft.border.BorderSide(1, ft.colors.GREY_200),
-                            horizontal_lines=ft.border.BorderSide(1, ft.colors.GREY_200),
-                        ),
+                        content=self.data_table,
                         height=400,
                         padding=10,
                         border=ft.border.all(1, ft.colors.GREY_300),
                         border_radius=10
+                    ),
+                    ft.Row(
+                        [self.prev_page_button, self.page_label, self.next_page_button],
+                        alignment=ft.MainAxisAlignment.CENTER
                     )
                 ],
                 spacing=10
             )
         )
     
+    def build_table(self):
+        """Crea el DataTable vacío y los controles de paginación"""
+        self.prev_page_button = ft.IconButton(
+            icon=ft.icons.CHEVRON_LEFT,
+            tooltip="Página anterior",
+            on_click=self.previous_page,
+            disabled=True
+        )
+        self.next_page_button = ft.IconButton(
+            icon=ft.icons.CHEVRON_RIGHT,
+            tooltip="Página siguiente",
+            on_click=self.next_page,
+            disabled=True
+        )
+        self.page_label = ft.Text("Página 1")
+        
+        # Grupo fijo de filas: al cambiar de página o de filtro solo se cambian sus
+        # valores, así Flet envía únicamente las celdas que cambiaron
+        self.table_rows = [self.create_table_row() for _ in range(self.page_size)]
+        self.data_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Modelo", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Título", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Precio", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Serie", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Fecha", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Acciones", weight=ft.FontWeight.BOLD)),
+            ],
+            rows=self.table_rows,
+            border=ft.border.all(1, ft.colors.GREY_300),
+            border_radius=10,
+            vertical_lines=ft.border.BorderSide(1, ft.colors.GREY_200),
+            horizontal_lines=ft.border.BorderSide(1, ft.colors.GREY_200),
+        )
+    
+    def create_table_row(self):
+        """Crea una fila vacía (oculta) del grupo de filas de la tabla"""
+        return ft.DataRow(
+            cells=[
+                ft.DataCell(ft.Text("")),
+                ft.DataCell(ft.Text("")),
+                ft.DataCell(ft.Text("")),
+                ft.DataCell(ft.Text("")),
+                ft.DataCell(ft.Text("")),
+                ft.DataCell(
+                    ft.IconButton(
+                        icon=ft.icons.OPEN_IN_NEW,
+                        tooltip="Ver en MercadoLibre",
+                        on_click=self.open_row_link
+                    )
+                )
+            ],
+            visible=False
+        )
+    
+    def filter_query(self):
+        """Filtro de MongoDB del filtro actual"""
+        return {} if self.current_filter == "Todas" else {"series": self.current_filter}
+    
+    def reset_pager(self):
+        """
+        Vuelve a la primera página y descarta las filas leídas. El paginador solo lee
+        los documentos del filtro actual: un filtro con pocas filas no obliga a leer
+        toda la colección.
+        """
+        self.pager = KeysetPager(
+            self.collection, TABLE_FIELDS, query=self.filter_query(),
+            page_size=self.page_size, newer_fields=STATS_FIELDS
+        )
+        self.df = pd.DataFrame()
+        self.page_index = 0
+    
+    def load_more_rows(self):
+        """Lee de MongoDB la siguiente tanda de filas y la agrega a self.df"""
+        documents = self.pager.fetch_next()
+        if documents:
+            # En la primera página se muestra la memoria antes y después de los tipos compactos
+            new_rows = add_display_columns(
+                mongo_to_dataframe(documents, schema=RTX_SCHEMA, report_memory=self.df.empty)
+            )
+            if not self.df.empty:
+                # Filas que ya llegaron antes como actualizaciones incrementales
+                new_rows = new_rows[~new_rows['_id'].isin(self.df['_id'])]
+            self.df = concat_frames([self.df, new_rows])
+        return len(documents)
+    
+    def merge_new_rows(self, documents):
+        """
+        Agrega al inicio de self.df los documentos más nuevos, reemplazando las filas
+        de los que ya estaban cargados (publicaciones actualizadas).
+        Retorna las series afectadas.
+        """
+        new_rows = add_display_columns(mongo_to_dataframe(documents, schema=RTX_SCHEMA))
+        new_rows = new_rows.drop(columns=STATS_FIELDS, errors='ignore')
+        remaining = self.df[~self.df['_id'].isin(new_rows['_id'])]
+        self.df = concat_frames([new_rows, remaining])
+        
+        if 'series' not in new_rows.columns:
+            return set()
+        return set(new_rows['series'].dropna())
+    
+    def ensure_page_loaded(self, page_index):
+        """Lee filas de MongoDB hasta completar la página pedida del filtro actual"""
+        needed_rows = (page_index + 1) * self.page_size
+        while len(self.df) < needed_rows and self.pager.has_more:
+            if self.load_more_rows() == 0:
+                break
+    
+    def current_page_df(self):
+        """Filas de la página actual del filtro actual"""
+        start = self.page_index * self.page_size
+        # self.df solo tiene filas del filtro actual: la página es un corte, sin copias
+        return self.df.iloc[start:start + self.page_size]
+    
+    def load_first_page(self):
+        """Reinicia la paginación y carga la primera página. Retorna True si hay datos"""
+        self.reset_pager()
+        self.ensure_page_loaded(0)
+        return not self.df.empty
+    
+    def run_in_background(self, task, message="Cargando datos...", key=None):
+        """
+        Ejecuta task() en el hilo de trabajo mostrando el indicador de carga.
+        Si ya hay una tarea con la misma `key` esperando su turno, la nueva se descarta
+        (varios clics seguidos en "Actualizar" producen una sola lectura).
+        Los cambios de la tarea se aplican al terminar con un solo page.update().
+        """
+        with self._task_lock:
+            if key is not None and key in self._queued_tasks:
+                return
+            if key is not None:
+                self._queued_tasks.add(key)
+            self._running_tasks += 1
+        
+        # message=None: tarea silenciosa (p. ej. cambios del modo en vivo)
+        if message is not None:
+            self.set_loading(True, message)
+        
+        def run():
+            with self._task_lock:
+                self._queued_tasks.discard(key)
+            try:
+                task()
+            except Exception as e:
+                self.show_message(f"❌ Error: {str(e)}", "#f44336", update=False)
+            finally:
+                with self._task_lock:
+                    self._running_tasks -= 1
+                    finished = self._running_tasks == 0
+                if finished:
+                    self.set_loading(False, update=False)
+                self.refresh_page()
+        
+        self._executor.submit(run)
+    
+    def set_loading(self, loading, message="", update=True):
+        """Muestra u oculta el indicador de carga"""
+        self.progress_ring.visible = loading
+        self.status_text.visible = loading
+        self.status_text.value = message
+        if update:
+            self.refresh_page()
+    
+    def refresh_page(self):
+        """Envía los cambios pendientes de la interfaz a la página"""
+        try:
+            if hasattr(self, 'page') and self.page is not None:
+                self.page.update()
+        except Exception as e:
+            print(f"Error actualizando la página: {e}")
+    
     def refresh_data(self, e):
-        """Actualiza los datos desde MongoDB"""
+        """Actualiza los datos desde MongoDB (en segundo plano, solo lo nuevo)"""
+        if self.collection is None:
+            self.show_message("❌ Error: No hay conexión a la base de datos", "#f44336")
+            return
+        self.run_in_background(self.load_new_data, "Actualizando datos...", key="refresh")
+    
+    def auto_load_data(self):
+        """Carga datos automáticamente al iniciar (en segundo plano)"""
+        if self.collection is None:
+            print("❌ Sin conexión a MongoDB: no se cargan datos")
+            return
+        print("🔄 Cargando datos automáticamente...")
+        self.run_in_background(lambda: self.load_all_data(notify=False), "Cargando datos...", key="refresh")
+    
+    def load_all_data(self, notify=True):
+        """Lee la primera página y las estadísticas. Se ejecuta en el hilo de trabajo"""
         try:
-            if self.collection is None:
-                self.show_message("❌ Error: No hay conexión a la base de datos", "#f44336")
+            # Primera página de datos (solo los campos de la tabla)
+            if not self.load_first_page():
+                self.update_data_table()
+                self.show_message("ℹ️ No hay datos en la base de datos. Ejecuta el scraper primero.", "#2196f3", update=False)
                 return
             
-            # Obtener datos de MongoDB
-            cursor = self.collection.find({}).sort("scraped_date", -1).limit(1000)
-            documents = list(cursor)
-            
-            if not documents:
-                self.show_message("ℹ️ No hay datos en la base de datos. Ejecuta el scraper primero.", "#2196f3")
-                return
-            
-            # Convertir a DataFrame
-            self.df = mongo_to_dataframe(documents)
-            
-            # Aplicar filtro actual
-            self.apply_current_filter()
+            print(f"🧮 Filas en memoria: {len(self.df)} ({memory_usage_mb(self.df):.2f} MB)")
             
             # Actualizar estadísticas
             self.update_statistics()
@@ -222,232 +442,409 @@ class RTXDashboard(ft.Container):
             # Actualizar tabla
             self.update_data_table()
             
-            self.show_message(f"✅ Datos actualizados: {len(self.df)} productos cargados", "#4caf50")
+            total = self.stats["total"] if self.stats else len(self.df)
+            print(f"✅ Datos cargados: {total} productos, primera página de {len(self.current_page_df())}")
+            if notify:
+                self.show_message(f"✅ Datos actualizados: {total} productos", "#4caf50", update=False)
             
         except Exception as e:
-            self.show_message(f"❌ Error actualizando datos: {str(e)}", "#f44336")
+            self.show_message(f"❌ Error actualizando datos: {str(e)}", "#f44336", update=False)
     
-    def auto_load_data(self):
-        """Carga datos automáticamente al iniciar"""
+    def load_new_data(self, notify=True):
+        """
+        Actualización incremental: pide a MongoDB solo los documentos escritos desde
+        la carga (marca de agua ingested_at del paginador), los combina con self.df y
+        recalcula las estadísticas solo si afectan al filtro actual.
+        Se ejecuta en el hilo de trabajo.
+        """
+        if self.pager is None or self.df.empty:
+            self.load_all_data()
+            return
+        
         try:
-            if self.collection is not None:
-                print("🔄 Cargando datos automáticamente...")
-                cursor = self.collection.find({}).sort("scraped_date", -1).limit(1000)
-                documents = list(cursor)
-                
-                if documents:
-                    self.df = mongo_to_dataframe(documents)
-                    self.apply_current_filter()
-                    print(f"✅ {len(self.df)} productos cargados automáticamente")
-                else:
-                    print("ℹ️ No hay datos en la base de datos")
+            documents = self.pager.fetch_newer(limit=self.max_incremental_rows)
+            
+            if len(documents) >= self.max_incremental_rows:
+                # Demasiados cambios: es más simple recargar desde la primera página
+                self.load_all_data()
+                return
+            
+            if not documents:
+                if notify:
+                    self.show_message("✅ Sin cambios desde la última actualización", "#4caf50", update=False)
+                return
+            
+            self.apply_new_rows(documents)
+            
+            if notify:
+                self.show_message(f"✅ {len(documents)} productos nuevos o actualizados", "#4caf50", update=False)
+            
         except Exception as e:
-            print(f"❌ Error cargando datos automáticamente: {e}")
+            self.show_message(f"❌ Error actualizando datos: {str(e)}", "#f44336", update=False)
     
-    def update_statistics(self):
-        """Actualiza las tarjetas de estadísticas"""
-        data_to_use = self.filtered_df if not self.filtered_df.empty else self.df
+    def apply_new_rows(self, documents):
+        """Combina documentos nuevos con self.df y actualiza solo lo afectado"""
+        changed_series = self.merge_new_rows(documents)
         
-        if data_to_use.empty:
+        if self.current_filter == "Todas" or self.current_filter in changed_series:
+            self.fold_statistics(documents)
+        self.update_data_table()
+    
+    def fold_statistics(self, documents):
+        """
+        Suma los documentos nuevos o actualizados a las estadísticas ya calculadas, sin
+        volver a recorrer la colección. Si no se puede hacer con exactitud (p. ej. se
+        quitó el precio mínimo), se recalculan con la agregación.
+        """
+        series = None if self.current_filter == "Todas" else self.current_filter
+        folded = fold_documents(self.stats, documents, series) if self.stats else None
+        if folded is None:
+            self.update_statistics()
             return
-        
+        self.stats = folded
+        self.show_stats_cards(folded)
+    
+    def toggle_watch(self, e):
+        """Activa o desactiva el modo en vivo"""
+        if e.control.value:
+            self.start_watch()
+        else:
+            self.stop_watch()
+    
+    def start_watch(self):
+        """Empieza a escuchar los cambios de la colección en un hilo aparte"""
+        if self.collection is None or (self._watch_thread is not None and self._watch_thread.is_alive()):
+            return
+        # Un evento nuevo por hilo: si el anterior todavía no vio su evento (apagar y
+        # encender rápido), sigue detenido en lugar de quedar dos hilos escuchando
+        self._watch_stop = threading.Event()
+        self._watch_thread = threading.Thread(
+            target=self.watch_changes, args=(self._watch_stop,), name="rtx-dashboard-watch", daemon=True
+        )
+        self._watch_thread.start()
+        print("📡 Modo en vivo activado")
+    
+    def stop_watch(self):
+        """Detiene el modo en vivo"""
+        self._watch_stop.set()
+        self._watch_thread = None
+        print("📡 Modo en vivo desactivado")
+    
+    def watch_changes(self, stop):
+        """
+        Escucha el change stream de la colección y aplica los cambios agrupados cada
+        watch_batch_seconds, hasta que se active el evento `stop`. Si el servidor no
+        soporta change streams (no es un replica set), cambia a consultas periódicas
+        por marca de agua.
+        """
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
         try:
-            total_products = len(data_to_use)
-            rtx40_count = len(data_to_use[data_to_use['series'] == 'RTX 40']) if 'series' in data_to_use.columns else 0
-            rtx50_count = len(data_to_use[data_to_use['series'] == 'RTX 50']) if 'series' in data_to_use.columns else 0
-            
-            # Calcular precio promedio
-            avg_price = 0
-            if 'price_numeric' in data_to_use.columns:
-                valid_prices = data_to_use[data_to_use['price_numeric'] > 0]['price_numeric']
-                if len(valid_prices) > 0:
-                    avg_price = valid_prices.mean()
-            
-            # Buscar las tarjetas y actualizar sus valores
-            try:
-                stats_container = self.content.controls[2].content.controls[0].content
-                if hasattr(stats_container, 'controls'):
-                    cards = stats_container.controls
-                    if len(cards) >= 4:
-                        cards[0].content.controls[1].value = str(total_products)
-                        cards[1].content.controls[1].value = str(rtx40_count)
-                        cards[2].content.controls[1].value = str(rtx50_count)
-                        cards[3].content.controls[1].value = f"S/ {avg_price:,.0f}"
+            with self.collection.watch(pipeline, full_document="updateLookup", max_await_time_ms=500) as stream:
+                batch = []
+                batch_deadline = None
+                while not stop.is_set() and stream.alive:
+                    change = stream.try_next()
+                    if change is not None and change.get("fullDocument"):
+                        batch.append(change["fullDocument"])
+                        if batch_deadline is None:
+                            batch_deadline = time.monotonic() + self.watch_batch_seconds
+                    
+                    if batch and time.monotonic() >= batch_deadline:
+                        self.queue_live_changes(batch)
+                        batch = []
+                        batch_deadline = None
                 
-                self.update()
-            except Exception as e:
-                print(f"Error actualizando tarjetas de estadísticas: {e}")
-            
+                if batch and not stop.is_set():
+                    self.queue_live_changes(batch)
+        except PyMongoError as e:
+            if stop.is_set():
+                return
+            print(f"⚠️ Change streams no disponibles ({e}); consultando cada {self.poll_interval_seconds} s")
+            self.poll_changes(stop)
+    
+    def poll_changes(self, stop):
+        """Modo en vivo sin change streams: actualización incremental periódica hasta `stop`"""
+        while not stop.wait(self.poll_interval_seconds):
+            self.run_in_background(lambda: self.load_new_data(notify=False), None, key="refresh")
+    
+    def queue_live_changes(self, documents):
+        """Envía al hilo de trabajo un lote de documentos recibidos por el change stream"""
+        rows = [
+            {field: doc.get(field) for field in ["_id", KeysetPager.HIGH_WATER_FIELD] + TABLE_FIELDS + STATS_FIELDS}
+            for doc in documents
+        ]
+        print(f"📡 {len(rows)} cambios recibidos en vivo")
+        self.run_in_background(lambda: self.apply_live_rows(rows), None)
+    
+    def apply_live_rows(self, rows):
+        """Aplica un lote de cambios en vivo. Se ejecuta en el hilo de trabajo"""
+        if self.pager is None or self.df.empty:
+            self.load_all_data(notify=False)
+            return
+        
+        # Un mismo documento puede llegar varias veces en el lote: gana el último
+        latest = {}
+        for row in rows:
+            latest[row["_id"]] = row
+        rows = sorted(latest.values(), key=lambda row: (row.get("scraped_date") or "", row["_id"]), reverse=True)
+        
+        # Solo los documentos del filtro actual (el paginador no lee los demás)
+        if self.current_filter != "Todas":
+            rows = [row for row in rows if row.get("series") == self.current_filter]
+            if not rows:
+                return
+        
+        self.pager.advance_high_water_mark(rows)
+        self.apply_new_rows(rows)
+    
+    def next_page(self, e):
+        """Muestra la página siguiente, leyéndola de MongoDB si hace falta"""
+        if self.pager is None:
+            return
+        self.run_in_background(self.load_next_page, "Cargando página...")
+    
+    def load_next_page(self):
+        """Avanza una página. Se ejecuta en el hilo de trabajo"""
+        self.ensure_page_loaded(self.page_index + 1)
+        if len(self.df) > (self.page_index + 1) * self.page_size:
+            self.page_index += 1
+            self.update_data_table()
+    
+    def previous_page(self, e):
+        """Muestra la página anterior (ya está en memoria)"""
+        self.run_in_background(self.load_previous_page, None)
+    
+    def load_previous_page(self):
+        """Retrocede una página. Se ejecuta en el hilo de trabajo, después de las lecturas pendientes"""
+        if self.page_index > 0:
+            self.page_index -= 1
+            self.update_data_table()
+
+    def update_pagination_controls(self):
+        """Actualiza el número de página y habilita/deshabilita los botones"""
+        shown_until = (self.page_index + 1) * self.page_size
+        has_next = len(self.df) > shown_until or (self.pager is not None and self.pager.has_more)
+        self.page_label.value = f"Página {self.page_index + 1}"
+        self.prev_page_button.disabled = self.page_index == 0
+        self.next_page_button.disabled = not has_next
+    
+    def load_statistics(self):
+        """Calcula las estadísticas del filtro actual con una agregación en MongoDB"""
+        if self.collection is None:
+            return None
+        series = None if self.current_filter == "Todas" else self.current_filter
+        self.stats = fetch_dashboard_stats(self.collection, series)
+        return self.stats
+    
+    def update_statistics(self):
+        """Actualiza las tarjetas de estadísticas"""
+        try:
+            stats = self.load_statistics()
         except Exception as e:
             print(f"Error calculando estadísticas: {e}")
+            return
+        self.show_stats_cards(stats)
     
-    def update_data_table(self):
-        """Actualiza la tabla de datos"""
-        data_to_use = self.filtered_df if not self.filtered_df.empty else self.df
-        
-        if data_to_use.empty:
+    def show_stats_cards(self, stats):
+        """Muestra en las tarjetas el total, los conteos por serie y el precio promedio"""
+        if not stats or stats["total"] == 0:
             return
         
+        total_products = stats["total"]
+        rtx40_count = stats["series_counts"].get("RTX 40", 0)
+        rtx50_count = stats["series_counts"].get("RTX 50", 0)
+        avg_price = stats["price"]["avg"] if stats["price"] else 0
+        
+        # Buscar las tarjetas y actualizar sus valores
         try:
-            # Obtener la tabla
-            table_container = self.content.controls[2].content.controls[1].content.controls[1].content
-            data_table = table_container
-            
-            # Limpiar filas existentes
-            data_table.rows.clear()
-            
-            # Agregar nuevas filas (limitamos a 50 para rendimiento)
-            for idx, row in data_to_use.head(50).iterrows():
-                # Formatear fecha
-                scraped_date = row.get('scraped_date', '')
-                if scraped_date:
-                    try:
-                        date_obj = datetime.fromisoformat(scraped_date.replace('Z', '+00:00'))
-                        formatted_date = date_obj.strftime('%d/%m/%Y')
-                    except:
-                        formatted_date = scraped_date[:10]
-                else:
-                    formatted_date = 'N/A'
-                
-                # Crear fila
-                data_table.rows.append(
-                    ft.DataRow(
-                        cells=[
-                            ft.DataCell(ft.Text(str(row.get('model_searched', 'N/A'))[:20])),
-                            ft.DataCell(ft.Text(str(row.get('title', 'N/A'))[:30] + "...")),
-                            ft.DataCell(ft.Text(str(row.get('price_text', 'N/A')))),
-                            ft.DataCell(ft.Text(str(row.get('series', 'N/A')))),
-                            ft.DataCell(ft.Text(formatted_date)),
-                            ft.DataCell(
-                                ft.IconButton(
-                                    icon=ft.icons.OPEN_IN_NEW,
-                                    tooltip="Ver en MercadoLibre",
-                                    on_click=lambda e, url=row.get('post_link', ''): self.open_link(url)
-                                )
-                            )
-                        ]
-                    )
-                )
+            stats_container = self.content.controls[2].content.controls[0].content
+            if hasattr(stats_container, 'controls'):
+                cards = stats_container.controls
+                if len(cards) >= 4:
+                    cards[0].content.controls[1].value = str(total_products)
+                    cards[1].content.controls[1].value = str(rtx40_count)
+                    cards[2].content.controls[1].value = str(rtx50_count)
+                    cards[3].content.controls[1].value = f"S/ {avg_price:,.0f}"
+        except Exception as e:
+            print(f"Error actualizando tarjetas de estadísticas: {e}")
+    
+    def update_data_table(self):
+        """Actualiza la tabla de datos con la página actual"""
+        data_to_use = self.current_page_df()
+        
+        try:
+            self.update_pagination_controls()
             
-            self.update()
+            # Reutilizar las filas del grupo: se cambian solo los valores. El texto
+            # ya viene formateado en las columnas display_* (calculadas al cargar)
+            if data_to_use.empty:
+                page_values = []
+            else:
+                page_columns = [data_to_use[column] for column in DISPLAY_COLUMNS]
+                page_values = list(zip(*page_columns))
+            
+            # Páginas más grandes que el grupo (no debería pasar): agregar filas
+            while len(self.table_rows) < len(page_values):
+                self.table_rows.append(self.create_table_row())
+            
+            for position, row in enumerate(self.table_rows):
+                if position >= len(page_values):
+                    row.visible = False
+                    continue
+                
+                cells = row.cells
+                *texts, link = page_values[position]
+                for cell, text in zip(cells, texts):
+                    cell.content.value = text
+                cells[-1].content.data = link
+                row.visible = True
             
         except Exception as e:
             print(f"Error actualizando tabla: {e}")
     
-    def show_statistics(self, e):
+    def show_statistics(self, e, update=True):
         """Muestra estadísticas detalladas"""
-        data_to_use = self.filtered_df if not self.filtered_df.empty else self.df
-        
-        if data_to_use.empty:
-            self.show_message("ℹ️ No hay datos cargados. Actualiza primero.", ft.colors.BLUE)
+        # Sin estadísticas todavía: calcularlas en segundo plano y volver a mostrar
+        if self.stats is None and self.collection is not None:
+            def task():
+                self.load_statistics()
+                self.show_statistics(e, update=False)
+            self.run_in_background(task, "Calculando estadísticas...", key="stats")
             return
         
         try:
-            # Estadísticas por modelo
-            model_stats = data_to_use['model_searched'].value_counts().head(10)
+            stats = self.stats
+            
+            if not stats or stats["total"] == 0:
+                self.show_message("ℹ️ No hay datos cargados. Actualiza primero.", ft.colors.BLUE, update=update)
+                return
             
             # Estadísticas de precios por serie
             price_stats = ""
-            if 'price_numeric' in data_to_use.columns and 'series' in data_to_use.columns:
-                for series in ['RTX 40', 'RTX 50']:
-                    series_data = data_to_use[data_to_use['series'] == series]
-                    if not series_data.empty:
-                        valid_prices = series_data[series_data['price_numeric'] > 0]['price_numeric']
-                        if len(valid_prices) > 0:
-                            price_stats += f"\n{series}:\n"
-                            price_stats += f"  • Precio mínimo: S/ {valid_prices.min():,.0f}\n"
-                            price_stats += f"  • Precio máximo: S/ {valid_prices.max():,.0f}\n"
-                            price_stats += f"  • Precio promedio: S/ {valid_prices.mean():,.0f}\n"
+            for series in ['RTX 40', 'RTX 50']:
+                series_prices = stats["price_by_series"].get(series)
+                if series_prices:
+                    price_stats += f"\n{series}:\n"
+                    price_stats += f"  • Precio mínimo: S/ {series_prices['min']:,.0f}\n"
+                    price_stats += f"  • Precio máximo: S/ {series_prices['max']:,.0f}\n"
+                    price_stats += f"  • Precio promedio: S/ {series_prices['avg']:,.0f}\n"
             
             filter_info = f" (Filtro: {self.current_filter})" if self.current_filter != "Todas" else ""
             stats_text = f"📊 Estadísticas{filter_info}\n\nTop 10 Modelos más encontrados:\n\n"
-            for model, count in model_stats.items():
+            for model, count in stats["top_models"]:
                 stats_text += f"• {model}: {count} productos\n"
             
             stats_text += f"\n💰 Estadísticas de Precios:{price_stats}"
             
             # Mostrar en un diálogo
-            self.show_dialog("📊 Estadísticas Detalladas", stats_text)
+            self.show_dialog("📊 Estadísticas Detalladas", stats_text, update=update)
             
         except Exception as e:
-            self.show_message(f"❌ Error calculando estadísticas: {str(e)}", "#f44336")
+            self.show_message(f"❌ Error calculando estadísticas: {str(e)}", "#f44336", update=update)
     
-    def show_price_analysis(self, e):
+    def show_price_analysis(self, e, update=True, fetch_median=True):
         """Muestra análisis de precios"""
-        data_to_use = self.filtered_df if not self.filtered_df.empty else self.df
-        
-        if data_to_use.empty:
-            self.show_message("ℹ️ No hay datos cargados. Actualiza primero.", ft.colors.BLUE)
+        # Sin estadísticas todavía: calcularlas en segundo plano y volver a mostrar
+        if self.stats is None and self.collection is not None:
+            def task():
+                self.load_statistics()
+                self.show_price_analysis(e, update=False)
+            self.run_in_background(task, "Calculando estadísticas...", key="stats")
             return
         
         try:
-            if 'price_numeric' not in data_to_use.columns:
-                self.show_message("❌ No hay datos de precios disponibles", ft.colors.RED)
+            stats = self.stats
+            
+            if not stats or stats["total"] == 0:
+                self.show_message("ℹ️ No hay datos cargados. Actualiza primero.", ft.colors.BLUE, update=update)
                 return
             
-            valid_df = data_to_use[data_to_use['price_numeric'] > 0]
+            price = stats["price"]
+            if not price:
+                self.show_message("❌ No hay precios válidos para analizar", ft.colors.RED, update=update)
+                return
             
-            if valid_df.empty:
-                self.show_message("❌ No hay precios válidos para analizar", ft.colors.RED)
+            # Después de sumar documentos nuevos la mediana queda pendiente: se pide ahora
+            if fetch_median and price.get('median') is None and self.collection is not None:
+                def task():
+                    series = None if self.current_filter == "Todas" else self.current_filter
+                    price['median'] = fetch_price_median(self.collection, series)
+                    self.show_price_analysis(e, update=False, fetch_median=False)
+                self.run_in_background(task, "Calculando la mediana...", key="stats")
                 return
             
             # Análisis general
             filter_info = f" (Filtro: {self.current_filter})" if self.current_filter != "Todas" else ""
             analysis_text = f"💰 Análisis de Precios{filter_info}:\n\n"
-            analysis_text += f"📦 Total productos con precio: {len(valid_df)}\n"
-            analysis_text += f"💵 Precio mínimo: S/ {valid_df['price_numeric'].min():,.0f}\n"
-            analysis_text += f"💵 Precio máximo: S/ {valid_df['price_numeric'].max():,.0f}\n"
-            analysis_text += f"💵 Precio promedio: S/ {valid_df['price_numeric'].mean():,.0f}\n"
-            analysis_text += f"💵 Precio mediano: S/ {valid_df['price_numeric'].median():,.0f}\n\n"
+            analysis_text += f"📦 Total productos con precio: {price['count']}\n"
+            analysis_text += f"💵 Precio mínimo: S/ {price['min']:,.0f}\n"
+            analysis_text += f"💵 Precio máximo: S/ {price['max']:,.0f}\n"
+            analysis_text += f"💵 Precio promedio: S/ {price['avg']:,.0f}\n"
+            if price.get('median') is not None:
+                analysis_text += f"💵 Precio mediano: S/ {price['median']:,.0f}\n"
+            analysis_text += "\n"
             
             # Rangos de precio
             analysis_text += "📈 Distribución por rangos:\n"
-            ranges = [
-                (0, 1000, "Menos de S/ 1,000"),
-                (1000, 2000, "S/ 1,000 - S/ 2,000"),
-                (2000, 3000, "S/ 2,000 - S/ 3,000"),
-                (3000, 5000, "S/ 3,000 - S/ 5,000"),
-                (5000, float('inf'), "Más de S/ 5,000")
-            ]
-            
-            for min_price, max_price, label in ranges:
-                count = len(valid_df[(valid_df['price_numeric'] >= min_price) & (valid_df['price_numeric'] < max_price)])
-                percentage = (count / len(valid_df)) * 100
+            for label, count in stats["price_ranges"]:
+                percentage = (count / price['count']) * 100
                 analysis_text += f"• {label}: {count} productos ({percentage:.1f}%)\n"
             
-            self.show_dialog("💰 Análisis de Precios", analysis_text)
+            self.show_dialog("💰 Análisis de Precios", analysis_text, update=update)
             
         except Exception as e:
-            self.show_message(f"❌ Error en análisis de precios: {str(e)}", ft.colors.RED)
+            self.show_message(f"❌ Error en análisis de precios: {str(e)}", ft.colors.RED, update=update)
     
     def filter_by_series(self, e):
         """Filtra los datos por serie de gráfica"""
-        if e.control.value:
-            self.current_filter = e.control.value
-            self.apply_current_filter()
-            self.update_statistics()
-            self.update_data_table()
-            
-            filter_text = "todas las series" if self.current_filter == "Todas" else f"serie {self.current_filter}"
-            self.show_message(f"🔍 Filtrado por {filter_text}: {len(self.filtered_df)} productos", "#2196f3")
+        series = e.control.value
+        if series:
+            self.run_in_background(lambda: self.load_filtered_data(series), "Filtrando...")
     
-    def apply_current_filter(self):
-        """Aplica el filtro actual a los datos"""
-        if self.df.empty:
-            self.filtered_df = pd.DataFrame()
+    def load_filtered_data(self, series):
+        """
+        Cambia el filtro y carga su primera página y estadísticas. Se ejecuta en el hilo
+        de trabajo: el filtro no cambia mientras otra tarea lee self.df.
+        """
+        self.current_filter = series
+        self.stats = None  # Las estadísticas anteriores son de otro filtro
+        if self.pager is None:
             return
-            
-        if self.current_filter == "Todas":
-            self.filtered_df = self.df.copy()
-        else:
-            self.filtered_df = self.df[self.df['series'] == self.current_filter].copy()
+        self.load_first_page()
+        self.update_statistics()
+        self.update_data_table()
+        
+        total = self.stats["total"] if self.stats else len(self.df)
+        filter_text = "todas las series" if self.current_filter == "Todas" else f"serie {self.current_filter}"
+        self.show_message(f"🔍 Filtrado por {filter_text}: {total} productos", "#2196f3", update=False)
     
     def download_csv(self, e):
-        """Descarga los datos filtrados en formato CSV"""
+        """Descarga los datos filtrados en formato CSV (en segundo plano)"""
+        self.start_export("csv")
+    
+    def download_parquet(self, e):
+        """Descarga los datos filtrados en formato Parquet (en segundo plano)"""
+        self.start_export("parquet")
+    
+    def start_export(self, file_format):
+        """Envía la exportación del filtro actual al hilo de trabajo"""
+        if self.collection is None:
+            self.show_message("❌ Error: No hay conexión a la base de datos", "#f44336")
+            return
+        self.run_in_background(
+            lambda: self.export_filtered(file_format),
+            f"Exportando {file_format.upper()}...",
+            key="export"
+        )
+    
+    def export_filtered(self, file_format="csv"):
+        """
+        Exporta los documentos del filtro actual. Se ejecuta en el hilo de trabajo.
+        La tabla solo tiene las páginas vistas: los documentos se leen de MongoDB
+        por partes y se escriben al archivo a medida que llegan.
+        """
         try:
-            if self.filtered_df.empty:
-                self.show_message("❌ No hay datos para descargar. Actualiza primero.", "#f44336")
-                return
+            query = self.filter_query()
             
             # Crear directorio de descargas si no existe
             import os
@@ -457,36 +854,21 @@ class RTXDashboard(ft.Container):
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filter_suffix = self.current_filter.replace(" ", "_").lower() if self.current_filter != "Todas" else "todas"
-            filename = f"rtx_graphics_{filter_suffix}_{timestamp}.csv"
+            filename = f"rtx_graphics_{filter_suffix}_{timestamp}.{file_format}"
             filepath = os.path.join(downloads_dir, filename)
             
-            # Preparar datos para exportar
-            export_df = self.filtered_df.copy()
-            
-            # Renombrar columnas para mejor legibilidad
-            column_mapping = {
-                'model_searched': 'Modelo_Buscado',
-                'title': 'Título',
-                'price_text': 'Precio_Texto',
-                'price_numeric': 'Precio_Numérico',
-                'series': 'Serie',
-                'post_link': 'Enlace_Producto',
-                'image_link': 'Enlace_Imagen',
-                'scraped_date': 'Fecha_Scraping',
-                'country': 'País',
-                'source': 'Fuente'
-            }
-            
-            # Renombrar solo las columnas que existen
-            existing_columns = {k: v for k, v in column_mapping.items() if k in export_df.columns}
-            export_df = export_df.rename(columns=existing_columns)
-            
-            # Exportar a CSV
-            export_df.to_csv(filepath, index=False, encoding='utf-8-sig', sep=';')
+            def report_progress(written, total):
+                self.set_loading(True, f"Exportando {file_format.upper()}... {written}/{total}")
+            
+            exported = export_collection(self.collection, filepath, query, progress=report_progress)
+            if exported == 0:
+                os.remove(filepath)
+                self.show_message("❌ No hay datos para descargar. Actualiza primero.", "#f44336", update=False)
+                return
             
             # Mostrar mensaje de éxito
             filter_text = f" ({self.current_filter})" if self.current_filter != "Todas" else ""
-            self.show_message(f"✅ Descarga exitosa: {len(export_df)} productos{filter_text} guardados en {filename}", "#4caf50")
+            self.show_message(f"✅ Descarga exitosa: {exported} productos{filter_text} guardados en {filename}", "#4caf50", update=False)
             
             # Abrir carpeta de descargas (opcional)
             try:
@@ -495,7 +877,11 @@ class RTXDashboard(ft.Container):
                 pass  # No es crítico si no puede abrir la carpeta
                 
         except Exception as e:
-            self.show_message(f"❌ Error descargando CSV: {str(e)}", "#f44336")
+            self.show_message(f"❌ Error descargando {file_format.upper()}: {str(e)}", "#f44336", update=False)
+    
+    def open_row_link(self, e):
+        """Abre el enlace guardado en el botón de una fila de la tabla"""
+        self.open_link(e.control.data)
     
     def open_link(self, url):
         """Abre un enlace en el navegador"""
@@ -503,15 +889,16 @@ class RTXDashboard(ft.Container):
             import webbrowser
             webbrowser.open(url)
     
-    def show_message(self, message, color):
-        """Muestra un mensaje temporal"""
+    def show_message(self, message, color, update=True):
+        """Muestra un mensaje temporal (update=False deja el envío a la página para después)"""
         print(f"DEBUG: show_message called with: {message}")
         try:
             if hasattr(self, 'page') and self.page is not None:
                 snack = ft.SnackBar(content=ft.Text(message), bgcolor=color)
                 self.page.snack_bar = snack
                 snack.open = True
-                self.page.update()
+                if update:
+                    self.page.update()
                 print(f"DEBUG: SnackBar shown successfully")
             else:
                 print(f"DEBUG: No page reference available")
@@ -521,8 +908,8 @@ class RTXDashboard(ft.Container):
             print(f"DEBUG: Error showing message: {e}")
             print(f"MESSAGE: {message}")
     
-    def show_dialog(self, title, content):
-        """Muestra un diálogo con información"""
+    def show_dialog(self, title, content, update=True):
+        """Muestra un diálogo con información (update=False deja el envío a la página para después)"""
         print(f"DEBUG: show_dialog called with title: {title}")
         try:
             if hasattr(self, 'page') and self.page is not None:
@@ -541,7 +928,8 @@ class RTXDashboard(ft.Container):
                 )
                 self.page.dialog = dialog
                 dialog.open = True
-                self.page.update()
+                if update:
+                    self.page.update()
                 print(f"DEBUG: Dialog shown successfully")
             else:
                 print(f"DEBUG: No page reference available")
@@ -1,12 +1,70 @@
 # utils/dataframe_tools.py
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
-def mongo_to_dataframe(mongo_documents):
+# Tipos compactos de la colección de gráficas RTX: categorías para los campos con
+# pocos valores distintos, float32 para los precios y datetime64 para las fechas
+RTX_SCHEMA = {
+    'series': 'category',
+    'model_searched': 'category',
+    'country': 'category',
+    'source': 'category',
+    'price_numeric': 'float32',
+    'scraped_date': 'datetime64',
+    'first_seen': 'datetime64',
+}
+
+def memory_usage_mb(df):
+    """Memoria del DataFrame en MB (incluye el contenido de los strings)"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def apply_schema(df, schema):
+    """Convierte las columnas de `df` a los tipos indicados en `schema` (las que existan)"""
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'datetime64':
+            df[column] = pd.to_datetime(df[column], errors='coerce', utc=True)
+        elif dtype == 'category':
+            df[column] = df[column].astype('category')
+        else:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(dtype)
+    return df
+
+def concat_frames(frames):
+    """
+    Concatena DataFrames conservando las columnas categóricas: pd.concat las
+    convierte a object si las categorías de cada parte no son iguales.
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    categorical = {
+        column for frame in frames for column in frame.columns
+        if isinstance(frame[column].dtype, pd.CategoricalDtype)
+    }
+    for column in categorical:
+        categories = pd.Index([])
+        for frame in frames:
+            if column in frame.columns:
+                values = frame[column]
+                new = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) else pd.Index(values.dropna().unique())
+                categories = categories.union(new, sort=False)
+        for position, frame in enumerate(frames):
+            if column in frame.columns:
+                frames[position] = frame.assign(**{column: pd.Categorical(frame[column], categories=categories)})
+
+    return pd.concat(frames, ignore_index=True)
+
+def mongo_to_dataframe(mongo_documents, schema=None, report_memory=False):
     """
     Convierte una lista de documentos de MongoDB a un Pandas DataFrame.
     Maneja el campo '_id' para que sea más amigable.
+    Con `schema` (p. ej. RTX_SCHEMA) las columnas se convierten a tipos compactos;
+    con `report_memory` se imprime la memoria antes y después de la conversión.
     """
     if not mongo_documents:
         return pd.DataFrame()
@@ -22,8 +80,110 @@ def mongo_to_dataframe(mongo_documents):
         # Intenta convertir, si falla, deja como está o maneja el error
         df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
 
+    if schema:
+        memory_before = memory_usage_mb(df) if report_memory else None
+        apply_schema(df, schema)
+        if report_memory:
+            memory_after = memory_usage_mb(df)
+            ratio = memory_before / memory_after if memory_after else 0
+            print(f"🧮 Memoria del DataFrame ({len(df)} filas): "
+                  f"{memory_before:.2f} MB → {memory_after:.2f} MB ({ratio:.1f}x menos)")
+
     return df
 
+def cursor_to_dataframe(cursor, fields, schema=None, batch_size=1000):
+    """
+    Lee un cursor de MongoDB directamente a columnas y arma el DataFrame una sola vez.
+    A diferencia de mongo_to_dataframe(list(cursor)), no guarda la lista completa de
+    documentos: cada documento se reparte en las columnas de `fields` y se descarta.
+    Las columnas float del `schema` se llenan en arreglos de NumPy preasignados.
+    """
+    schema = schema or {}
+    numeric_fields = [field for field in fields if str(schema.get(field, '')).startswith('float')]
+    capacity = batch_size
+    buffers = {field: [] for field in fields}
+    for field in numeric_fields:
+        buffers[field] = np.full(capacity, np.nan, dtype=schema[field])
+
+    if hasattr(cursor, 'batch_size'):
+        cursor = cursor.batch_size(batch_size)
+
+    count = 0
+    for document in cursor:
+        if count == capacity:
+            # Duplicar los arreglos numéricos cuando se llenan
+            capacity *= 2
+            for field in numeric_fields:
+                grown = np.full(capacity, np.nan, dtype=schema[field])
+                grown[:count] = buffers[field]
+                buffers[field] = grown
+
+        for field in fields:
+            value = document.get(field)
+            if field in numeric_fields:
+                try:
+                    buffers[field][count] = value if value is not None else np.nan
+                except (TypeError, ValueError):
+                    pass  # Queda NaN
+            else:
+                buffers[field].append(value)
+        count += 1
+
+    df = pd.DataFrame({
+        field: buffers[field][:count] if field in numeric_fields else buffers[field]
+        for field in fields
+    })
+    if '_id' in df.columns:
+        df['_id'] = df['_id'].astype(str)
+    if schema:
+        apply_schema(df, {field: dtype for field, dtype in schema.items() if field not in numeric_fields})
+    return df
+
+# Columnas con el texto listo para mostrar en la tabla del dashboard RTX
+DISPLAY_COLUMNS = [
+    'display_model', 'display_title', 'display_price',
+    'display_series', 'display_date', 'display_link'
+]
+
+def _text_column(df, column, default='N/A'):
+    """Columna como texto, con `default` en los valores nulos o si la columna no existe"""
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].astype(object).where(df[column].notna(), default).astype(str)
+
+def add_display_columns(df):
+    """
+    Agrega al DataFrame las columnas DISPLAY_COLUMNS con el texto que muestra la
+    tabla del dashboard (truncado, fechas en dd/mm/aaaa, 'N/A' en vacíos).
+    Todo se calcula columna por columna, una sola vez al cargar los datos.
+    """
+    if df.empty:
+        for column in DISPLAY_COLUMNS:
+            df[column] = pd.Series(dtype=object)
+        return df
+
+    df['display_model'] = _text_column(df, 'model_searched').str.slice(0, 20)
+    df['display_title'] = _text_column(df, 'title').str.slice(0, 30) + "..."
+    df['display_price'] = _text_column(df, 'price_text')
+    df['display_series'] = _text_column(df, 'series')
+    df['display_link'] = _text_column(df, 'post_link', default='')
+
+    # Fecha: dd/mm/aaaa si se puede interpretar, los 10 primeros caracteres si no
+    raw_dates = _text_column(df, 'scraped_date', default='')
+    if 'scraped_date' in df.columns and pd.api.types.is_datetime64_any_dtype(df['scraped_date']):
+        parsed_dates = df['scraped_date']  # Ya convertida por RTX_SCHEMA
+    else:
+        parsed_dates = pd.to_datetime(raw_dates, errors='coerce', utc=True)
+    formatted = parsed_dates.dt.strftime('%d/%m/%Y')
+    formatted = formatted.where(parsed_dates.notna(), raw_dates.str.slice(0, 10))
+    df['display_date'] = formatted.where(raw_dates != '', 'N/A')
+
+    return df
+
+def format_table_cells(df, max_length=50):
+    """Convierte todas las celdas a texto truncado ('' en los nulos), columna por columna"""
+    return df.astype(object).where(df.notna(), '').astype(str).apply(lambda column: column.str.slice(0, max_length))
+
 def dataframe_to_mongo(dataframe):
     """
     Convierte un Pandas DataFrame a una lista de diccionarios (documentos para MongoDB).
@@ -0,0 +1,157 @@
+# utils/exporter.py
+
+"""
+Exportación por partes de la colección de gráficas RTX a CSV o Parquet.
+Los documentos se leen del cursor de MongoDB de a `chunk_size` y cada parte se
+escribe al archivo apenas se lee, así la memoria usada no depende del tamaño de
+la colección.
+"""
+
+import os
+import sys
+from itertools import islice
+
+# Agregar el directorio padre al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dataframe_tools import cursor_to_dataframe
+
+# Campos exportados y su nombre en el archivo
+EXPORT_COLUMNS = {
+    'model_searched': 'Modelo_Buscado',
+    'title': 'Título',
+    'price_text': 'Precio_Texto',
+    'price_numeric': 'Precio_Numérico',
+    'series': 'Serie',
+    'post_link': 'Enlace_Producto',
+    'image_link': 'Enlace_Imagen',
+    'scraped_date': 'Fecha_Scraping',
+    'country': 'País',
+    'source': 'Fuente',
+    'vram_gb': 'VRAM_GB',
+    'brand': 'Marca',
+    'seller': 'Vendedor',
+    'stock': 'Stock',
+    'condition': 'Condición'
+}
+
+NUMERIC_FIELDS = {'price_numeric', 'vram_gb', 'stock'}
+
+
+def export_format(filepath):
+    """Formato de exportación según la extensión del archivo ('csv' o 'parquet')"""
+    return 'parquet' if filepath.lower().endswith('.parquet') else 'csv'
+
+
+def _as_text(series):
+    """Columna como texto, conservando los nulos (tipos estables entre partes)"""
+    return series.map(lambda value: None if value is None or value != value else str(value))
+
+
+class _CSVWriter:
+    """Escribe las partes una tras otra en el mismo CSV (encabezado solo en la primera)"""
+
+    def __init__(self, filepath, sep=';'):
+        self.filepath = filepath
+        self.sep = sep
+        self.started = False
+
+    def write(self, df):
+        if not self.started:
+            # utf-8-sig agrega el BOM para que Excel reconozca los acentos
+            df.to_csv(self.filepath, index=False, encoding='utf-8-sig', sep=self.sep)
+            self.started = True
+        else:
+            df.to_csv(self.filepath, index=False, encoding='utf-8', sep=self.sep, mode='a', header=False)
+
+    def close(self):
+        pass
+
+
+class _ParquetWriter:
+    """Escribe cada parte como un row group del mismo archivo Parquet (requiere pyarrow)"""
+
+    def __init__(self, filepath, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Para exportar a Parquet instala pyarrow: pip install pyarrow")
+
+        self.pa = pa
+        self.schema = pa.schema([
+            (name, pa.float64() if field in NUMERIC_FIELDS else pa.string())
+            for field, name in columns.items()
+        ])
+        self.writer = pq.ParquetWriter(filepath, self.schema)
+
+    def write(self, df):
+        table = self.pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+def export_cursor(cursor, filepath, columns=None, chunk_size=5000, total=None, progress=None):
+    """
+    Escribe los documentos de `cursor` en `filepath` (CSV con ';' o Parquet según
+    la extensión), de a `chunk_size` documentos.
+    `columns` es {campo: nombre en el archivo} (por defecto EXPORT_COLUMNS).
+    `progress(escritos, total)` se llama después de cada parte.
+    Retorna la cantidad de documentos exportados.
+    """
+    columns = columns or EXPORT_COLUMNS
+    fields = list(columns)
+    schema = {field: 'float64' for field in fields if field in NUMERIC_FIELDS}
+
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    if export_format(filepath) == 'parquet':
+        writer = _ParquetWriter(filepath, columns)
+    else:
+        writer = _CSVWriter(filepath)
+
+    if hasattr(cursor, 'batch_size'):
+        cursor = cursor.batch_size(chunk_size)
+    documents = iter(cursor)
+
+    written = 0
+    try:
+        while True:
+            chunk = cursor_to_dataframe(islice(documents, chunk_size), fields, schema=schema, batch_size=chunk_size)
+            if chunk.empty:
+                break
+
+            for field in fields:
+                if field not in NUMERIC_FIELDS:
+                    chunk[field] = _as_text(chunk[field])
+            writer.write(chunk.rename(columns=columns))
+
+            written += len(chunk)
+            if progress:
+                progress(written, total)
+            if len(chunk) < chunk_size:
+                break
+    finally:
+        writer.close()
+
+    # Sin documentos: dejar al menos el encabezado del CSV
+    if written == 0 and isinstance(writer, _CSVWriter):
+        cursor_to_dataframe([], fields).rename(columns=columns).to_csv(
+            filepath, index=False, encoding='utf-8-sig', sep=writer.sep
+        )
+    return written
+
+
+def export_collection(collection, filepath, query=None, chunk_size=5000, progress=None):
+    """Exporta los documentos de la colección que cumplen `query`, del más nuevo al más viejo"""
+    query = query or {}
+    projection = {field: 1 for field in EXPORT_COLUMNS}
+    projection['_id'] = 0
+
+    total = collection.count_documents(query)
+    cursor = collection.find(query, projection).sort("scraped_date", -1)
+    try:
+        return export_cursor(cursor, filepath, chunk_size=chunk_size, total=total, progress=progress)
+    finally:
+        cursor.close()